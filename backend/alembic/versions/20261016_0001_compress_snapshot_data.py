@@ -0,0 +1,24 @@
+"""Store config snapshot payloads with lz4 TOAST compression
+
+Revision ID: 20261016_0001
+Revises: 0f174eb7bad3
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20261016_0001"
+down_revision: Union[str, None] = "0f174eb7bad3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres already compresses large text values out of line (TOAST);
+    # lz4 compresses/decompresses several times faster than the default pglz.
+    # Applies to newly written rows — existing rows keep their compression.
+    op.execute("ALTER TABLE config_snapshots ALTER COLUMN data_json SET COMPRESSION lz4")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE config_snapshots ALTER COLUMN data_json SET COMPRESSION pglz")
@@ -0,0 +1,35 @@
+"""Store devices.tags as JSONB with a GIN index
+
+Revision ID: 20261016_0003
+Revises: 20261016_0001
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "20261016_0003"
+down_revision: Union[str, None] = "20261016_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "devices", "tags",
+        existing_type=sa.String(length=1024),
+        type_=postgresql.JSONB(),
+        postgresql_using="COALESCE(NULLIF(tags, ''), '[]')::jsonb",
+    )
+    op.create_index("ix_devices_tags", "devices", ["tags"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_devices_tags", table_name="devices", postgresql_using="gin")
+    op.alter_column(
+        "devices", "tags",
+        existing_type=postgresql.JSONB(),
+        type_=sa.String(length=1024),
+        postgresql_using="tags::text",
+    )
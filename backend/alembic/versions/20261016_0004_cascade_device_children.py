@@ -0,0 +1,36 @@
+"""Cascade device deletes to snapshots, results, job targets, metrics and backup settings
+
+Revision ID: 20261016_0004
+Revises: 20261016_0003
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20261016_0004"
+down_revision: Union[str, None] = "20261016_0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = (
+    "config_snapshots",
+    "compliance_results",
+    "bulk_job_targets",
+    "device_metrics",
+    "device_backup_settings",
+)
+
+
+def _recreate(ondelete) -> None:
+    for table in _TABLES:
+        name = f"{table}_device_id_fkey"
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(name, table, "devices", ["device_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _recreate("CASCADE")
+
+
+def downgrade() -> None:
+    _recreate(None)
@@ -0,0 +1,27 @@
+"""Covering (device_id, version DESC) index on config_snapshots
+
+Revision ID: 20261016_0005
+Revises: 20261016_0004
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261016_0005"
+down_revision: Union[str, None] = "20261016_0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_snapshots_device_version",
+        "config_snapshots",
+        ["device_id", sa.text("version DESC")],
+        postgresql_include=["id", "checksum", "section", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_snapshots_device_version", table_name="config_snapshots")
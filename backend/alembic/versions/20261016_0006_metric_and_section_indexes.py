@@ -0,0 +1,32 @@
+"""Composite indexes for per-device metrics and per-section snapshots
+
+Revision ID: 20261016_0006
+Revises: 20261016_0005
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261016_0006"
+down_revision: Union[str, None] = "20261016_0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_device_metrics_device_collected",
+        "device_metrics",
+        ["device_id", sa.text("collected_at DESC")],
+    )
+    op.create_index(
+        "ix_snapshots_device_section_version",
+        "config_snapshots",
+        ["device_id", "section", sa.text("version DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_snapshots_device_section_version", table_name="config_snapshots")
+    op.drop_index("ix_device_metrics_device_collected", table_name="device_metrics")
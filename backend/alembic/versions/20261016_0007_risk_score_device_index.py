@@ -0,0 +1,26 @@
+"""Composite index for latest risk score per device
+
+Revision ID: 20261016_0007
+Revises: 20261016_0006
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261016_0007"
+down_revision: Union[str, None] = "20261016_0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_risk_scores_device_calculated",
+        "device_risk_scores",
+        ["device_id", sa.text("calculated_at DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_risk_scores_device_calculated", table_name="device_risk_scores")
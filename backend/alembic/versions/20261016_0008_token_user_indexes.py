@@ -0,0 +1,33 @@
+"""Composite indexes for per-user session and API token listings
+
+Revision ID: 20261016_0008
+Revises: 20261016_0007
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261016_0008"
+down_revision: Union[str, None] = "20261016_0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_refresh_tokens_user_active",
+        "refresh_tokens",
+        ["user_id", sa.text("created_at DESC")],
+        postgresql_where=sa.text("revoked = false"),
+    )
+    op.create_index(
+        "ix_api_tokens_user_created",
+        "api_tokens",
+        ["user_id", sa.text("created_at DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_tokens_user_created", table_name="api_tokens")
+    op.drop_index("ix_refresh_tokens_user_active", table_name="refresh_tokens")
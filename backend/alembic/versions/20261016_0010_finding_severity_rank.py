@@ -0,0 +1,36 @@
+"""Generated severity_rank column and listing index on security_findings
+
+Revision ID: 20261016_0010
+Revises: 20261016_0009
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261016_0010"
+down_revision: Union[str, None] = "20261016_0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEVERITY_RANK_SQL = (
+    "CASE severity WHEN 'critical' THEN 0 WHEN 'high' THEN 1 WHEN 'medium' THEN 2 "
+    "WHEN 'low' THEN 3 WHEN 'info' THEN 4 ELSE 5 END"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "security_findings",
+        sa.Column("severity_rank", sa.SmallInteger(), sa.Computed(SEVERITY_RANK_SQL, persisted=True)),
+    )
+    op.create_index(
+        "ix_security_findings_rank_title",
+        "security_findings",
+        ["severity_rank", "title", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_security_findings_rank_title", table_name="security_findings")
+    op.drop_column("security_findings", "severity_rank")
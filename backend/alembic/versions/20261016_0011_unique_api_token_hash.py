@@ -0,0 +1,23 @@
+"""Make the api_tokens.token_hash index unique
+
+Revision ID: 20261016_0011
+Revises: 20261016_0010
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20261016_0011"
+down_revision: Union[str, None] = "20261016_0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_api_tokens_token_hash", table_name="api_tokens")
+    op.create_index("ix_api_tokens_token_hash", "api_tokens", ["token_hash"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_tokens_token_hash", table_name="api_tokens")
+    op.create_index("ix_api_tokens_token_hash", "api_tokens", ["token_hash"])
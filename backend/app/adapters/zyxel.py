@@ -16,6 +16,10 @@ from app.adapters.base import FirewallAdapter
 
 logger = logging.getLogger(__name__)
 
+# Firewalls use self-signed certificates; one unverified context is shared by
+# every client instead of httpx building a new SSLContext per connection.
+_TLS_CONTEXT = httpx.create_ssl_context(verify=False)
+
 # Section → ordered list of CLI commands to try (first non-empty result wins).
 # Multiple candidates handle firmware differences across FLEX models.
 _SECTION_CLI: dict[str, list[str]] = {
@@ -188,7 +192,7 @@ class ZyxelAdapter(FirewallAdapter):
         return f"{device.protocol}://{device.mgmt_ip}:{device.port}"
 
     def _client(self, device) -> httpx.Client:
-        return httpx.Client(verify=False, timeout=30.0, follow_redirects=False)
+        return httpx.Client(verify=_TLS_CONTEXT, timeout=30.0, follow_redirects=False)
 
     def _extract_token(self, client: httpx.Client, resp: httpx.Response) -> str | None:
         """Try to extract a session token from the response (any status)."""
@@ -419,7 +423,7 @@ class ZyxelAdapter(FirewallAdapter):
     def test_connection(self, device, credentials: dict, timeout: int = 5) -> dict:
         t0 = time.monotonic()
         try:
-            with httpx.Client(verify=False, timeout=float(timeout), follow_redirects=False) as c:
+            with httpx.Client(verify=_TLS_CONTEXT, timeout=float(timeout), follow_redirects=False) as c:
                 self._authenticate(c, self._base_url(device), credentials)
             return {"success": True, "message": "Connected",
                     "latency_ms": round((time.monotonic() - t0) * 1000, 1)}
@@ -1,13 +1,13 @@
 import csv
 import io
-import json
 from datetime import datetime
 from typing import Optional, List
 
+import orjson
 from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlmodel import select
+from sqlmodel import Session, select
 
 from app.core.deps import SuperUser, DBSession
 from app.models.audit import AuditLog
@@ -61,6 +61,8 @@ KNOWN_ACTIONS: List[dict] = [
 
 _ACTION_SET = {a["action"] for a in KNOWN_ACTIONS}
 
+_EXPORT_BATCH = 1000
+
 
 class ActionConfigUpdate(BaseModel):
     enabled: bool
@@ -74,7 +76,7 @@ def _log_dict(log: AuditLog) -> dict:
         "action": log.action,
         "resource_type": log.resource_type,
         "resource_id": log.resource_id,
-        "details": json.loads(log.details) if log.details else None,
+        "details": orjson.loads(log.details) if log.details else None,
         "ip_address": log.ip_address,
         "created_at": log.created_at,
     }
@@ -120,7 +122,6 @@ def get_action_configs(session: DBSession, current: SuperUser):
 
 @router.get("/export")
 def export_audit_logs(
-    session: DBSession,
     current: SuperUser,
     action: Optional[str] = None,
     username: Optional[str] = None,
@@ -139,26 +140,40 @@ def export_audit_logs(
     if date_to:
         stmt = stmt.where(AuditLog.created_at <= date_to)
 
-    logs = [_log_dict(l) for l in session.exec(stmt).all()]
+    stmt = stmt.execution_options(yield_per=_EXPORT_BATCH)
 
     if format == "json":
-        content = json.dumps(logs, indent=2, default=str)
+        def json_chunks():
+            yield b"["
+            for i, log in enumerate(_export_logs(stmt)):
+                row = orjson.dumps(log, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  ")
+                yield (b",\n  " if i else b"\n  ") + row
+            yield b"\n]"
+
         return StreamingResponse(
-            iter([content]),
+            json_chunks(),
             media_type="application/json",
             headers={"Content-Disposition": "attachment; filename=audit_logs.json"},
         )
 
     # CSV export
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=["id", "username", "action", "resource_type",
-                                                  "resource_id", "ip_address", "created_at"])
-    writer.writeheader()
-    for log in logs:
-        writer.writerow({k: log.get(k, "") for k in writer.fieldnames})
-    output.seek(0)
+    fieldnames = ["id", "username", "action", "resource_type",
+                  "resource_id", "ip_address", "created_at"]
+
+    def csv_chunks():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(fieldnames)
+        for i, log in enumerate(_export_logs(stmt), 1):
+            writer.writerow([log[k] for k in fieldnames])
+            if i % _EXPORT_BATCH == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+
     return StreamingResponse(
-        iter([output.getvalue()]),
+        csv_chunks(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=audit_logs.csv"},
     )
@@ -183,3 +198,16 @@ def update_action_config(
     known = next((a for a in KNOWN_ACTIONS if a["action"] == action), None)
     base = known or {"action": action, "label": action, "description": "", "category": "Other"}
     return {**base, "enabled": cfg.enabled, "log_payload": cfg.log_payload}
+
+
+def _export_logs(stmt):
+    """
+    Run an export query in its own session and yield rows as dicts.
+
+    The response body is produced after the request's session has been closed,
+    so the generator cannot use it.
+    """
+    from app.db.session import get_engine
+    with Session(get_engine()) as export_session:
+        for log in export_session.exec(stmt):
+            yield _log_dict(log)
@@ -11,6 +11,7 @@ from app.db.session import get_session
 from app.models.user import User
 from app.core.security import verify_password, create_access_token, create_refresh_token, decode_token, hash_password, password_needs_rehash
 from app.core.deps import CurrentUser, DBSession
+from app.services import user_cache
 from app.services.audit import write_audit
 
 router = APIRouter()
@@ -80,6 +81,7 @@ def login(
         user.updated_at = datetime.now(timezone.utc)
         session.add(user)
         session.commit()
+        user_cache.invalidate(user.id)
     tokens = TokenResponse(
         access_token=create_access_token(str(user.id)),
         refresh_token=create_refresh_token(str(user.id)),
@@ -93,13 +95,13 @@ def login(
 
 @router.post("/refresh", response_model=TokenResponse)
 def refresh(body: RefreshRequest, session: DBSession):
-    from jose import JWTError
+    from jwt import InvalidTokenError
     try:
         payload = decode_token(body.refresh_token)
         if payload.get("type") != "refresh":
-            raise JWTError()
+            raise InvalidTokenError()
         user_id = payload["sub"]
-    except JWTError:
+    except InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
     user = session.get(User, user_id)
     if not user or not user.is_active:
@@ -1,11 +1,13 @@
-import json
 import uuid
-import hashlib
 from datetime import datetime, timezone
 from typing import Optional, List
 
-from fastapi import APIRouter, HTTPException, Response
-from fastapi.responses import JSONResponse
+import orjson
+import redis as redis_lib
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
+from sqlalchemy.orm import defer
 from sqlmodel import select
 from pydantic import BaseModel
 
@@ -13,14 +15,14 @@ from app.core.deps import CurrentUser, DBSession, RBAC
 from app.models.device import Device
 from app.models.config import ConfigSnapshot
 from app.models.backup import DeviceBackupSettings
-from app.services.crypto import decrypt_credentials
 from app.services.audit import write_audit
-from app.adapters.registry import get_adapter
+from app.services.redis_client import get_redis
+from app.services.snapshots import snapshot_data
 
 router = APIRouter()
 
 
-def _snap_dict(s: ConfigSnapshot, device: Optional[Device] = None) -> dict:
+def _snap_dict(s: ConfigSnapshot, device: Optional[Device] = None, size: Optional[int] = None) -> dict:
     return {
         "id": str(s.id),
         "device_id": str(s.device_id),
@@ -31,36 +33,25 @@ def _snap_dict(s: ConfigSnapshot, device: Optional[Device] = None) -> dict:
         "triggered_by": s.triggered_by,
         "label": s.label,
         "created_at": s.created_at,
-        "size": len(s.data_json),
+        "size": size if size is not None else len(s.data_json),
         "device_name": device.name if device else None,
     }
 
 
-def _store_snapshot(
-    session,
-    device_id,
-    config: dict,
-    triggered_by: str,
-    label: Optional[str] = None,
-) -> ConfigSnapshot:
-    data_str = json.dumps(config)
-    checksum = hashlib.sha256(data_str.encode()).hexdigest()
-    latest = session.exec(
-        select(ConfigSnapshot)
-        .where(ConfigSnapshot.device_id == device_id)
-        .order_by(ConfigSnapshot.version.desc())
-    ).first()
-    version = (latest.version + 1) if latest else 1
-    snapshot = ConfigSnapshot(
-        device_id=device_id,
-        data_json=data_str,
-        checksum=checksum,
-        version=version,
-        triggered_by=triggered_by,
-        label=label,
-    )
-    session.add(snapshot)
-    return snapshot
+def _etag_headers(snap: ConfigSnapshot) -> dict:
+    # Snapshots are immutable, so the content checksum is a strong validator
+    return {"ETag": f'"{snap.checksum}"', "Cache-Control": "private, max-age=31536000, immutable"}
+
+
+def _not_modified(request: Request, snap: ConfigSnapshot) -> Optional[Response]:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    # Weak comparison (RFC 9110 13.1.2): a gzipping proxy turns our ETag into W/"..."
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    if "*" in tags or f'"{snap.checksum}"' in tags:
+        return Response(status_code=304, headers=_etag_headers(snap))
+    return None
 
 
 def _settings_dict(s: DeviceBackupSettings) -> dict:
@@ -91,67 +82,65 @@ class UploadRestoreRequest(BaseModel):
     label: Optional[str] = None
 
 
-@router.post("/{device_id}/trigger")
-def trigger_backup(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentUser):
-    rbac.require("view_devices")
-    device = session.get(Device, device_id)
-    if not device:
-        raise HTTPException(status_code=404, detail="Device not found")
+# Queued backup/restore tasks, so GET /tasks/{id} only answers for tasks
+# queued here and only to the user who queued them (or a superuser). Kept as
+# long as Celery keeps results (result_expires, one day by default).
+_TASK_KEY = "ztm:backup_task:{}"
+_TASK_TTL = 86400
 
-    creds = decrypt_credentials(device.encrypted_credentials) if device.encrypted_credentials else {}
+
+def _queued(task_fn, args: list, kind: str, device_id, current, wait: bool, timeout: int):
+    """
+    Queue ``task_fn`` and return its task id (202), or block for its result
+    and return that with 200 when wait=True.
+    """
+    if wait:
+        try:
+            return ORJSONResponse(task_fn.delay(*args).get(timeout=timeout), status_code=200)
+        except Exception as exc:
+            raise HTTPException(status_code=502, detail=str(exc))
+
+    # Record the owner under a pre-generated id before queueing: if Redis is
+    # down nothing has been queued yet, so the client can safely retry.
+    task_id = str(uuid.uuid4())
+    owner = {"kind": kind, "user_id": str(current.id), "device_id": str(device_id)}
     try:
-        config = get_adapter(device.adapter).fetch_config(device, creds, section="full")
-    except Exception as exc:
-        write_audit(None, "trigger_backup_failed", current, "device", str(device_id),
-                    response_body={"error": str(exc), "phase": "fetch_config"})
-        raise HTTPException(status_code=502, detail=str(exc))
+        get_redis().setex(_TASK_KEY.format(task_id), _TASK_TTL, orjson.dumps(owner))
+    except redis_lib.RedisError:
+        raise HTTPException(status_code=503, detail="Task queue unavailable, try again")
+    task_fn.apply_async(args=args, task_id=task_id)
+    return {"task_id": task_id, "status": "queued"}
 
-    data_str = json.dumps(config)
-    checksum = hashlib.sha256(data_str.encode()).hexdigest()
 
-    latest = session.exec(
-        select(ConfigSnapshot)
-        .where(ConfigSnapshot.device_id == device_id)
-        .order_by(ConfigSnapshot.version.desc())
-    ).first()
-    version = (latest.version + 1) if latest else 1
-
-    snapshot = ConfigSnapshot(
-        device_id=device_id,
-        data_json=data_str,
-        checksum=checksum,
-        version=version,
-        triggered_by="manual",
-    )
-    session.add(snapshot)
+@router.get("/tasks/{task_id}")
+def get_backup_task(task_id: str, rbac: RBAC, current: CurrentUser):
+    """Poll a backup/restore task queued by the caller."""
+    rbac.require("view_devices")
+    raw = get_redis().get(_TASK_KEY.format(task_id))
+    owner = orjson.loads(raw) if raw else None
+    if owner is None or (owner["user_id"] != str(current.id) and not current.is_superuser):
+        raise HTTPException(status_code=404, detail="Task not found")
+    from app.tasks.celery_app import celery_app
+    res = celery_app.AsyncResult(task_id)
+    resp: dict = {"task_id": task_id, "kind": owner["kind"], "status": res.state.lower()}
+    if res.successful():
+        resp["result"] = res.result
+    elif res.failed():
+        resp["error"] = str(res.result)
+    return resp
 
-    # Enforce retention
-    settings = session.get(DeviceBackupSettings, device_id)
-    if settings and settings.retention is not None:
-        all_snaps = session.exec(
-            select(ConfigSnapshot)
-            .where(ConfigSnapshot.device_id == device_id)
-            .order_by(ConfigSnapshot.created_at.asc())
-        ).all()
-        excess = len(all_snaps) - settings.retention + 1
-        if excess > 0:
-            for old in all_snaps[:excess]:
-                session.delete(old)
 
-    try:
-        session.commit()
-        session.refresh(snapshot)
-    except Exception as exc:
-        session.rollback()
-        write_audit(None, "trigger_backup_failed", current, "device", str(device_id),
-                    response_body={"error": str(exc), "phase": "save_snapshot"})
-        raise HTTPException(status_code=500, detail=f"Failed to save snapshot: {exc}")
-
-    resp = _snap_dict(snapshot, device)
-    write_audit(None, "trigger_backup", current, "device", str(device_id),
-                response_body={"snapshot_id": resp["id"], "version": resp["version"],
-                               "checksum": resp["checksum"]})
-    return resp
+@router.post("/{device_id}/trigger", status_code=202)
+def trigger_backup(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentUser,
+                   wait: bool = False):
+    rbac.require("view_devices")
+    device = session.get(Device, device_id)
+    if not device:
+        raise HTTPException(status_code=404, detail="Device not found")
+    # The device round-trip runs on a Celery worker, not the HTTP worker
+    from app.tasks.backup import backup_device
+    return _queued(backup_device, [str(device_id), "manual", str(current.id)],
+                   "backup", device_id, current, wait, timeout=120)
 
 
 @router.get("/{device_id}")
@@ -167,23 +156,30 @@ def list_backups(
     device = session.get(Device, device_id)
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
-    snaps = session.exec(
-        select(ConfigSnapshot)
+    # The config itself is not needed for the listing; only its length
+    rows = session.exec(
+        select(ConfigSnapshot, func.length(ConfigSnapshot.data_json))
+        .options(defer(ConfigSnapshot.data_json))
         .where(ConfigSnapshot.device_id == device_id)
         .order_by(ConfigSnapshot.version.desc())
         .offset(offset)
         .limit(limit)
     ).all()
-    return [_snap_dict(s, device) for s in snaps]
+    return ORJSONResponse([_snap_dict(s, device, size) for s, size in rows])
 
 
 @router.get("/{snapshot_id}/data")
-def get_backup_data(snapshot_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentUser):
+def get_backup_data(snapshot_id: uuid.UUID, request: Request, response: Response,
+                    session: DBSession, rbac: RBAC, current: CurrentUser):
     rbac.require("view_devices")
     snap = session.get(ConfigSnapshot, snapshot_id)
     if not snap:
         raise HTTPException(status_code=404, detail="Snapshot not found")
-    return json.loads(snap.data_json)
+    not_modified = _not_modified(request, snap)
+    if not_modified:
+        return not_modified
+    response.headers.update(_etag_headers(snap))
+    return snapshot_data(session, snap)
 
 
 @router.delete("/{snapshot_id}", status_code=204)
@@ -202,18 +198,25 @@ def delete_backup(snapshot_id: uuid.UUID, session: DBSession, rbac: RBAC, curren
 
 
 @router.get("/{snapshot_id}/download")
-def download_backup(snapshot_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentUser):
+def download_backup(snapshot_id: uuid.UUID, request: Request,
+                    session: DBSession, rbac: RBAC, current: CurrentUser):
     rbac.require("view_devices")
     snap = session.get(ConfigSnapshot, snapshot_id)
     if not snap:
         raise HTTPException(status_code=404, detail="Snapshot not found")
+    not_modified = _not_modified(request, snap)
+    if not_modified:
+        return not_modified
     device = session.get(Device, snap.device_id)
     device_name = device.name.replace(" ", "_") if device else "device"
     date_str = snap.created_at.strftime("%Y-%m-%d") if snap.created_at else "unknown"
     filename = f"{device_name}-config-v{snap.version}-{date_str}.json"
-    return JSONResponse(
-        content=json.loads(snap.data_json),
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    # data_json is already serialised JSON — send it as-is
+    return Response(
+        content=snap.data_json,
+        media_type="application/json",
+        headers={"Content-Disposition": f"attachment; filename={filename}",
+                 **_etag_headers(snap)},
     )
 
 
@@ -256,139 +259,47 @@ def update_backup_settings(
     return resp
 
 
-@router.post("/{snapshot_id}/restore")
+@router.post("/{snapshot_id}/restore", status_code=202)
 def restore_backup(
     snapshot_id: uuid.UUID,
     body: RestoreRequest,
     session: DBSession,
     rbac: RBAC,
     current: CurrentUser,
+    wait: bool = False,
 ):
     rbac.require("edit_devices", "write")
     snap = session.get(ConfigSnapshot, snapshot_id)
     if not snap:
         raise HTTPException(status_code=404, detail="Snapshot not found")
-    config = json.loads(snap.data_json)
 
     target_device_id = uuid.UUID(body.device_id) if body.device_id else snap.device_id
     device = session.get(Device, target_device_id)
     if not device:
         raise HTTPException(status_code=404, detail="Target device not found")
 
-    creds = decrypt_credentials(device.encrypted_credentials) if device.encrypted_credentials else {}
-
-    # Pre-restore safety backup
-    try:
-        current_config = get_adapter(device.adapter).fetch_config(device, creds, section="full")
-        pre_snap = _store_snapshot(session, device.id, current_config, triggered_by="pre_restore")
-        session.commit()
-        session.refresh(pre_snap)
-    except Exception as exc:
-        session.rollback()
-        write_audit(None, "restore_backup_failed", current, "device", str(device.id),
-                    response_body={"error": str(exc), "phase": "pre_restore_backup",
-                                   "snapshot_id": str(snapshot_id)})
-        raise HTTPException(status_code=502, detail=f"Failed to create pre-restore backup: {exc}")
-
-    # Restore
-    try:
-        result = get_adapter(device.adapter).restore_config(device, creds, config)
-    except NotImplementedError as exc:
-        write_audit(None, "restore_backup_failed", current, "device", str(device.id),
-                    response_body={"error": str(exc), "snapshot_id": str(snapshot_id)})
-        raise HTTPException(status_code=501, detail=str(exc))
-    except Exception as exc:
-        write_audit(None, "restore_backup_failed", current, "device", str(device.id),
-                    response_body={"error": str(exc), "snapshot_id": str(snapshot_id)})
-        raise HTTPException(status_code=502, detail=str(exc))
-
-    if not result.get("success"):
-        write_audit(None, "restore_backup_failed", current, "device", str(device.id),
-                    response_body={"message": result.get("message"), "snapshot_id": str(snapshot_id)})
-        raise HTTPException(status_code=502, detail=result.get("message", "Restore failed"))
-
-    write_audit(None, "restore_backup", current, "device", str(device.id),
-                request_body={"snapshot_id": str(snapshot_id), "version": snap.version,
-                              "device_name": device.name},
-                response_body={"pre_restore_snapshot_id": str(pre_snap.id)})
-    return {
-        "success": True,
-        "message": result.get("message", "Configuration restored successfully"),
-        "pre_restore_snapshot_id": str(pre_snap.id),
-    }
+    from app.tasks.backup import restore_snapshot
+    return _queued(restore_snapshot, [str(snapshot_id), str(device.id), str(current.id)],
+                   "restore", device.id, current, wait, timeout=300)
 
 
-@router.post("/{device_id}/upload-restore")
+@router.post("/{device_id}/upload-restore", status_code=202)
 def upload_restore(
     device_id: uuid.UUID,
     body: UploadRestoreRequest,
     session: DBSession,
     rbac: RBAC,
     current: CurrentUser,
+    wait: bool = False,
 ):
     rbac.require("edit_devices", "write")
     device = session.get(Device, device_id)
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
 
-    creds = decrypt_credentials(device.encrypted_credentials) if device.encrypted_credentials else {}
-
-    # Pre-restore safety backup
-    try:
-        current_config = get_adapter(device.adapter).fetch_config(device, creds, section="full")
-        pre_snap = _store_snapshot(session, device_id, current_config, triggered_by="pre_restore")
-        session.commit()
-        session.refresh(pre_snap)
-    except Exception as exc:
-        session.rollback()
-        write_audit(None, "upload_restore_failed", current, "device", str(device_id),
-                    response_body={"error": str(exc), "phase": "pre_restore_backup"})
-        raise HTTPException(status_code=502, detail=f"Failed to create pre-restore backup: {exc}")
-
-    # Restore
-    try:
-        result = get_adapter(device.adapter).restore_config(device, creds, body.config)
-    except NotImplementedError as exc:
-        write_audit(None, "upload_restore_failed", current, "device", str(device_id),
-                    response_body={"error": str(exc)})
-        raise HTTPException(status_code=501, detail=str(exc))
-    except Exception as exc:
-        write_audit(None, "upload_restore_failed", current, "device", str(device_id),
-                    response_body={"error": str(exc)})
-        raise HTTPException(status_code=502, detail=str(exc))
-
-    if not result.get("success"):
-        write_audit(None, "upload_restore_failed", current, "device", str(device_id),
-                    response_body={"message": result.get("message")})
-        raise HTTPException(status_code=502, detail=result.get("message", "Restore failed"))
-
-    # Store uploaded config as a new snapshot
-    try:
-        snap = _store_snapshot(session, device_id, body.config, triggered_by="upload", label=body.label)
-        session.commit()
-        session.refresh(snap)
-    except Exception as exc:
-        session.rollback()
-        write_audit(None, "upload_restore", current, "device", str(device_id),
-                    response_body={"warning": f"Restore succeeded but snapshot save failed: {exc}",
-                                   "pre_restore_snapshot_id": str(pre_snap.id)})
-        return {
-            "success": True,
-            "message": result.get("message", "Configuration restored successfully"),
-            "snapshot_id": None,
-            "pre_restore_snapshot_id": str(pre_snap.id),
-        }
-
-    write_audit(None, "upload_restore", current, "device", str(device_id),
-                request_body={"label": body.label},
-                response_body={"snapshot_id": str(snap.id), "version": snap.version,
-                               "pre_restore_snapshot_id": str(pre_snap.id)})
-    return {
-        "success": True,
-        "message": result.get("message", "Configuration restored successfully"),
-        "snapshot_id": str(snap.id),
-        "pre_restore_snapshot_id": str(pre_snap.id),
-    }
+    from app.tasks.backup import upload_restore as upload_restore_task
+    return _queued(upload_restore_task, [str(device_id), body.config, body.label, str(current.id)],
+                   "upload_restore", device_id, current, wait, timeout=300)
 
 
 @router.post("/compare")
@@ -408,5 +319,5 @@ def compare_backups(body: CompareRequest, session: DBSession, rbac: RBAC, curren
             raise HTTPException(status_code=404, detail=f"Snapshot {sid} not found")
         device = session.get(Device, snap.device_id)
         snapshots.append(_snap_dict(snap, device))
-        data[sid] = json.loads(snap.data_json)
+        data[sid] = snapshot_data(session, snap)
     return {"snapshots": snapshots, "data": data}
@@ -1,9 +1,11 @@
-import json
 import uuid
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+import orjson
+
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import func, insert
 from sqlmodel import select
 from pydantic import BaseModel
 
@@ -13,6 +15,7 @@ from app.models.device import Device
 from app.models.config import ConfigSnapshot
 from app.services.diff import compute_diff, apply_patch as do_patch
 from app.services.audit import write_audit
+from app.services.snapshots import snapshot_data
 
 router = APIRouter()
 
@@ -44,7 +47,7 @@ def create_bulk_job(body: BulkJobCreate, session: DBSession, rbac: RBAC, current
     job = BulkJob(
         name=body.name,
         section=body.section,
-        patch_json=json.dumps(body.patch),
+        patch_json=orjson.dumps(body.patch).decode(),
         created_by=current.id,
         schedule_enabled=body.schedule_enabled,
         cron_expression=body.cron_expression,
@@ -52,8 +55,11 @@ def create_bulk_job(body: BulkJobCreate, session: DBSession, rbac: RBAC, current
     )
     session.add(job)
     session.flush()
-    for did in body.device_ids:
-        session.add(BulkJobTarget(job_id=job.id, device_id=did))
+    if body.device_ids:
+        # One multi-row INSERT instead of an ORM object + INSERT per target
+        session.execute(insert(BulkJobTarget).values(
+            [{"job_id": job.id, "device_id": did} for did in body.device_ids]
+        ))
     session.commit()
     session.refresh(job)
     resp = _job_dict(job, session)
@@ -66,9 +72,17 @@ def create_bulk_job(body: BulkJobCreate, session: DBSession, rbac: RBAC, current
 
 
 @router.get("/jobs")
-def list_jobs(session: DBSession, rbac: RBAC, current: CurrentUser):
+def list_jobs(
+    session: DBSession,
+    rbac: RBAC,
+    current: CurrentUser,
+    limit: int = Query(default=100, le=500),
+    offset: int = 0,
+):
     rbac.require("bulk_actions")
-    jobs = session.exec(select(BulkJob).order_by(BulkJob.created_at.desc())).all()
+    jobs = session.exec(
+        select(BulkJob).order_by(BulkJob.created_at.desc()).offset(offset).limit(limit)
+    ).all()
     return [_job_dict(j, session) for j in jobs]
 
 
@@ -83,9 +97,9 @@ def get_job(job_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentU
                         .order_by(BulkJobLog.created_at)).all()
     return {
         **_job_dict(job, session),
-        "patch": json.loads(job.patch_json),
+        "patch": orjson.loads(job.patch_json),
         "targets": [{"id": str(t.id), "device_id": str(t.device_id), "status": t.status,
-                     "diff": json.loads(t.diff_json) if t.diff_json else None,
+                     "diff": orjson.loads(t.diff_json) if t.diff_json else None,
                      "error": t.error, "executed_at": t.executed_at} for t in targets],
         "logs": [{"level": l.level, "message": l.message, "created_at": l.created_at} for l in logs],
     }
@@ -97,20 +111,38 @@ def preview_job(job_id: uuid.UUID, session: DBSession, rbac: RBAC, current: Curr
     job = session.get(BulkJob, job_id)
     if not job:
         raise HTTPException(status_code=404)
-    patch = json.loads(job.patch_json)
+    patch = orjson.loads(job.patch_json)
     targets = session.exec(select(BulkJobTarget).where(BulkJobTarget.job_id == job_id)).all()
+    device_ids = [t.device_id for t in targets]
+    if not device_ids:
+        return []
+    devices = {d.id: d for d in session.exec(select(Device).where(Device.id.in_(device_ids))).all()}
+    # Latest snapshot of the job's section per device, in one query
+    ranked = (
+        select(
+            ConfigSnapshot.id,
+            func.row_number().over(
+                partition_by=ConfigSnapshot.device_id,
+                order_by=ConfigSnapshot.version.desc(),
+            ).label("rn"),
+        )
+        .where(ConfigSnapshot.device_id.in_(device_ids),
+               ConfigSnapshot.section == job.section)
+        .subquery()
+    )
+    latest = session.exec(
+        select(ConfigSnapshot)
+        .join(ranked, ranked.c.id == ConfigSnapshot.id)
+        .where(ranked.c.rn == 1)
+    ).all()
+    by_dev = {s.device_id: s for s in latest}
     previews = []
     for t in targets:
-        device = session.get(Device, t.device_id)
+        device = devices.get(t.device_id)
         if not device:
             continue
-        snap = session.exec(
-            select(ConfigSnapshot)
-            .where(ConfigSnapshot.device_id == t.device_id,
-                   ConfigSnapshot.section == job.section)
-            .order_by(ConfigSnapshot.version.desc())
-        ).first()
-        before = json.loads(snap.data_json) if snap else {}
+        snap = by_dev.get(t.device_id)
+        before = snapshot_data(session, snap) if snap else {}
         after = do_patch(before, patch)
         previews.append({"device_id": str(t.device_id), "device_name": device.name,
                          "before": before, "after": after, "diff": compute_diff(before, after)})
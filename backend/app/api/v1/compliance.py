@@ -2,9 +2,10 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy import delete as sql_delete
+from sqlalchemy import tuple_
 from sqlmodel import select
 
 from app.core.deps import CurrentUser, DBSession
@@ -57,9 +58,19 @@ def _result_dict(r: ComplianceResult) -> dict:
 
 
 @router.get("/rules")
-def list_rules(current: CurrentUser, session: DBSession):
-    rules = session.exec(select(ComplianceRule)).all()
-    return [_rule_dict(r) for r in rules]
+def list_rules(
+    current: CurrentUser,
+    session: DBSession,
+    limit: int = Query(default=100, le=500),
+    offset: int = 0,
+):
+    rules = session.exec(
+        select(ComplianceRule)
+        .order_by(ComplianceRule.created_at, ComplianceRule.id)
+        .offset(offset)
+        .limit(limit)
+    ).all()
+    return ORJSONResponse([_rule_dict(r) for r in rules])
 
 
 @router.post("/rules", status_code=201)
@@ -104,19 +115,40 @@ def delete_rule(rule_id: uuid.UUID, current: CurrentUser, session: DBSession):
     rule = session.get(ComplianceRule, rule_id)
     if not rule:
         raise HTTPException(status_code=404)
-    session.execute(sql_delete(ComplianceResult).where(ComplianceResult.rule_id == rule_id))
-    session.flush()
+    # compliance_results rows go with it via ON DELETE CASCADE
     session.delete(rule)
     session.commit()
     write_audit(session, "delete_compliance_rule", current, "compliance_rule", str(rule_id), {})
 
 
 @router.get("/results")
-def list_results(current: CurrentUser, session: DBSession):
+def list_results(
+    current: CurrentUser,
+    session: DBSession,
+    limit: int = Query(default=100, le=500),
+    offset: int = 0,
+    before: Optional[datetime] = Query(default=None, description="Keyset cursor: checked_at of the last row seen"),
+    before_id: Optional[uuid.UUID] = Query(default=None, description="Keyset cursor: id of the last row seen"),
+):
+    """
+    Results newest first. Page with ``before``/``before_id`` set to the
+    ``checked_at``/``id`` of the last row received; ``offset`` only applies
+    without a cursor.
+    """
+    stmt = select(ComplianceResult)
+    if (before is None) != (before_id is None):
+        raise HTTPException(status_code=400, detail="before and before_id must be given together")
+    if before is not None:
+        # checked_at is shared by every result of a check run; id breaks the tie
+        stmt = stmt.where(
+            tuple_(ComplianceResult.checked_at, ComplianceResult.id) < tuple_(before, before_id)
+        )
+    else:
+        stmt = stmt.offset(offset)
     results = session.exec(
-        select(ComplianceResult).order_by(ComplianceResult.checked_at.desc())
+        stmt.order_by(ComplianceResult.checked_at.desc(), ComplianceResult.id.desc()).limit(limit)
     ).all()
-    return [_result_dict(r) for r in results]
+    return ORJSONResponse([_result_dict(r) for r in results])
 
 
 @router.post("/check", status_code=202)
@@ -1,5 +1,4 @@
 """Cross-snapshot configuration search endpoint."""
-import json
 import uuid
 from typing import Optional
 
@@ -9,28 +8,24 @@ from sqlmodel import select
 from app.core.deps import CurrentUser, DBSession, RBAC
 from app.models.config import ConfigSnapshot
 from app.models.device import Device
+from app.services.snapshots import snapshot_data
 
 router = APIRouter()
 
 
-def _flatten(data, prefix: str = "") -> dict:
-    """Recursively flatten nested dict/list to dot-notation keys."""
-    items = {}
+def _iter_flat(data, prefix: str = ""):
+    """Recursively yield (dot-notation key, leaf value) pairs of a nested dict/list."""
     if isinstance(data, dict):
-        for k, v in data.items():
-            full_key = f"{prefix}.{k}" if prefix else k
-            if isinstance(v, (dict, list)):
-                items.update(_flatten(v, full_key))
-            else:
-                items[full_key] = v
+        pairs = ((f"{prefix}.{k}" if prefix else k, v) for k, v in data.items())
     elif isinstance(data, list):
-        for i, v in enumerate(data):
-            full_key = f"{prefix}[{i}]"
-            if isinstance(v, (dict, list)):
-                items.update(_flatten(v, full_key))
-            else:
-                items[full_key] = v
-    return items
+        pairs = ((f"{prefix}[{i}]", v) for i, v in enumerate(data))
+    else:
+        return
+    for full_key, v in pairs:
+        if isinstance(v, (dict, list)):
+            yield from _iter_flat(v, full_key)
+        else:
+            yield full_key, v
 
 
 @router.get("")
@@ -61,32 +56,35 @@ def search_config(
             seen.add(key)
             snapshots.append(snap)
 
+    device_ids = {snap.device_id for snap in snapshots}
+    device_names = dict(
+        session.exec(select(Device.id, Device.name).where(Device.id.in_(device_ids))).all()
+    ) if device_ids else {}
+
     results = []
     for snap in snapshots:
         try:
-            data = json.loads(snap.data_json)
+            data = snapshot_data(session, snap)
         except Exception:
             continue
 
-        flat = _flatten(data)
-        matches = [
-            {"key": k, "value": str(v)}
-            for k, v in flat.items()
-            if q_lower in k.lower() or q_lower in str(v).lower()
-        ]
+        matches = []
+        for k, v in _iter_flat(data):
+            if q_lower in k.lower() or q_lower in str(v).lower():
+                matches.append({"key": k, "value": str(v)})
+                if len(matches) == 50:
+                    break
 
         if matches:
-            device = session.get(Device, snap.device_id)
             results.append({
                 "device_id": str(snap.device_id),
-                "device_name": device.name if device else "Unknown",
+                "device_name": device_names.get(snap.device_id, "Unknown"),
                 "section": snap.section,
                 "snapshot_id": str(snap.id),
                 "snapshot_version": snap.version,
-                "matches": matches[:50],
+                "matches": matches,
             })
-
-        if len(results) >= limit:
-            break
+            if len(results) >= limit:
+                break
 
     return results
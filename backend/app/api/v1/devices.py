@@ -1,29 +1,52 @@
+import codecs
 import csv
-import io
-import json
+import operator
 import uuid
-import hashlib
+import socket
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timezone
 from typing import Optional, List
 
+import orjson
+
 from fastapi import APIRouter, HTTPException, UploadFile, File, Query
-from sqlalchemy import delete as sql_delete
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert
+from sqlalchemy.orm import defer, selectinload
 from sqlmodel import select
 from pydantic import BaseModel
 
 from app.core.deps import CurrentUser, DBSession, RBAC
 from app.models.device import Device
 from app.models.config import ConfigSnapshot
-from app.models.compliance import ComplianceResult
-from app.models.backup import DeviceBackupSettings
-from app.models.job import BulkJobTarget
-from app.models.metric import DeviceMetric
-from app.services.crypto import encrypt_credentials, decrypt_credentials
+from app.services.crypto import encrypt_credentials, encrypt_credentials_many, decrypt_credentials
 from app.services.audit import write_audit
+from app.services.snapshots import store_snapshot
 from app.adapters.registry import get_adapter
 
 router = APIRouter()
 
+# Diagnostics only probe reachability, so the device certificate is not verified.
+_PROBE_SSL_CONTEXT = ssl.create_default_context()
+_PROBE_SSL_CONTEXT.check_hostname = False
+_PROBE_SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
+# Adapter calls made by diagnostics run here so a stalled device cannot hold
+# the request past _DIAG_STEP_TIMEOUT.
+_DIAG_STEP_TIMEOUT = 20
+_DIAG_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="diagnostics")
+
+
+def _bounded(fn, *args, **kwargs):
+    """Run fn with a deadline; on timeout the call is abandoned, not cancelled."""
+    future = _DIAG_POOL.submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=_DIAG_STEP_TIMEOUT)
+    except FutureTimeout:
+        raise TimeoutError(f"No response within {_DIAG_STEP_TIMEOUT} s") from None
+
 
 class DeviceCreate(BaseModel):
     name: str
@@ -53,38 +76,47 @@ class DeviceUpdate(BaseModel):
     label_color: Optional[str] = None
 
 
+_DEVICE_FIELDS = (
+    "name", "model", "mgmt_ip", "port", "protocol", "adapter", "status",
+    "last_seen", "firmware_version", "created_at", "drift_detected",
+    "drift_detected_at", "notes", "label_color", "credentials_updated_at",
+    "deleted_at",
+)
+_device_values = operator.attrgetter(*_DEVICE_FIELDS)
+
+
 def _device_dict(d: Device) -> dict:
-    return {
-        "id": str(d.id), "name": d.name, "model": d.model, "mgmt_ip": d.mgmt_ip,
-        "port": d.port, "protocol": d.protocol, "adapter": d.adapter,
-        "tags": json.loads(d.tags or "[]"), "status": d.status,
-        "last_seen": d.last_seen, "firmware_version": d.firmware_version,
-        "created_at": d.created_at,
-        "group_ids": [str(g.id) for g in d.groups],
-        "drift_detected": d.drift_detected,
-        "drift_detected_at": d.drift_detected_at,
-        "notes": d.notes,
-        "label_color": d.label_color,
-        "credentials_updated_at": d.credentials_updated_at,
-        "deleted_at": d.deleted_at,
-    }
+    out = dict(zip(_DEVICE_FIELDS, _device_values(d)))
+    out["id"] = str(d.id)
+    out["tags"] = d.tags or []
+    out["group_ids"] = [str(g.id) for g in d.groups]
+    return out
 
 
 @router.get("")
 def list_devices(session: DBSession, rbac: RBAC, current: CurrentUser):
     rbac.require("view_devices")
-    devices = session.exec(select(Device).where(Device.deleted_at == None)).all()  # noqa: E711
+    stmt = select(Device).where(Device.deleted_at == None)  # noqa: E711
     allowed = rbac.accessible_device_ids()
     if allowed is not None:
-        devices = [d for d in devices if str(d.id) in allowed]
-    return [_device_dict(d) for d in devices]
+        if not allowed:
+            return []
+        stmt = stmt.where(Device.id.in_([uuid.UUID(a) for a in allowed]))
+    devices = session.exec(
+        stmt.options(defer(Device.encrypted_credentials), selectinload(Device.groups))
+    ).all()
+    return ORJSONResponse([_device_dict(d) for d in devices])
 
 
 @router.get("/deleted")
 def list_deleted_devices(session: DBSession, rbac: RBAC, current: CurrentUser):
     rbac.require("view_devices")
-    devices = session.exec(select(Device).where(Device.deleted_at != None)).all()  # noqa: E711
-    return [_device_dict(d) for d in devices]
+    devices = session.exec(
+        select(Device)
+        .where(Device.deleted_at != None)  # noqa: E711
+        .options(defer(Device.encrypted_credentials), selectinload(Device.groups))
+    ).all()
+    return ORJSONResponse([_device_dict(d) for d in devices])
 
 
 @router.post("", status_code=201)
@@ -94,30 +126,26 @@ def create_device(body: DeviceCreate, session: DBSession, rbac: RBAC, current: C
         name=body.name, model=body.model, mgmt_ip=body.mgmt_ip,
         port=body.port, protocol=body.protocol, adapter=body.adapter,
         encrypted_credentials=encrypt_credentials(body.username, body.password),
-        tags=json.dumps(body.tags),
+        tags=body.tags,
         notes=body.notes,
         label_color=body.label_color,
         credentials_updated_at=datetime.now(timezone.utc),
     )
-    session.add(device)
-    session.commit()
-    session.refresh(device)
-    # Try to get firmware version immediately (non-critical, best-effort)
+    # Try to get firmware version before the insert (non-critical, best-effort)
     try:
         creds_dict = {"username": body.username, "password": body.password}
         info = get_adapter(body.adapter).get_device_info(device, creds_dict)
         if info.get("firmware_version"):
             device.firmware_version = info["firmware_version"]
-            session.add(device)
-            session.commit()
-            session.refresh(device)
     except Exception:
         pass
+    session.add(device)
     resp = _device_dict(device)
-    write_audit(session, "create_device", current, "device", str(device.id), {"name": device.name},
+    session.commit()
+    write_audit(session, "create_device", current, "device", resp["id"], {"name": resp["name"]},
                 request_body={"name": body.name, "model": body.model, "mgmt_ip": body.mgmt_ip,
                               "port": body.port, "protocol": body.protocol, "adapter": body.adapter,
-                              "tags": body.tags, "username": body.username, "password": body.password},
+                              "tags": body.tags, "username": body.username, "password": "***"},
                 response_body=resp)
     return resp
 
@@ -125,7 +153,7 @@ def create_device(body: DeviceCreate, session: DBSession, rbac: RBAC, current: C
 @router.get("/{device_id}")
 def get_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentUser):
     rbac.require("view_devices")
-    device = session.get(Device, device_id)
+    device = session.get(Device, device_id, options=[selectinload(Device.groups)])
     if not device:
         raise HTTPException(status_code=404)
     return _device_dict(device)
@@ -135,15 +163,15 @@ def get_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: Cu
 def update_device(device_id: uuid.UUID, body: DeviceUpdate, session: DBSession,
                   rbac: RBAC, current: CurrentUser):
     rbac.require("edit_devices", "write")
-    device = session.get(Device, device_id)
+    device = session.get(Device, device_id, options=[selectinload(Device.groups)])
     if not device:
         raise HTTPException(status_code=404)
     for field in ("name", "model", "mgmt_ip", "port", "protocol", "adapter"):
         v = getattr(body, field)
         if v is not None:
             setattr(device, field, v)
-    if body.tags is not None:
-        device.tags = json.dumps(body.tags)
+    if body.tags is not None and body.tags != (device.tags or []):
+        device.tags = body.tags
     if body.username or body.password:
         creds = decrypt_credentials(device.encrypted_credentials) if device.encrypted_credentials else {}
         device.encrypted_credentials = encrypt_credentials(
@@ -157,11 +185,13 @@ def update_device(device_id: uuid.UUID, body: DeviceUpdate, session: DBSession,
         device.label_color = body.label_color
     device.updated_at = datetime.now(timezone.utc)
     session.add(device)
-    session.commit()
-    session.refresh(device)
     resp = _device_dict(device)
+    session.commit()
+    audit_body = body.model_dump(exclude_none=True)
+    if "password" in audit_body:
+        audit_body["password"] = "***"
     write_audit(session, "update_device", current, "device", str(device_id),
-                request_body=body.model_dump(exclude_none=True),
+                request_body=audit_body,
                 response_body=resp)
     return resp
 
@@ -186,17 +216,18 @@ def delete_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current:
 def restore_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentUser):
     """Restore a soft-deleted device back to active."""
     rbac.require("edit_devices", "write")
-    device = session.get(Device, device_id)
+    device = session.get(Device, device_id, options=[selectinload(Device.groups)])
     if not device:
         raise HTTPException(status_code=404)
     if device.deleted_at is None:
         raise HTTPException(status_code=409, detail="Device is not deleted")
     device.deleted_at = None
     session.add(device)
+    resp = _device_dict(device)
     session.commit()
     write_audit(session, "restore_device", current, "device", str(device_id),
-                request_body={"device_id": str(device_id), "name": device.name})
-    return _device_dict(device)
+                request_body={"device_id": str(device_id), "name": resp["name"]})
+    return resp
 
 
 @router.delete("/{device_id}/permanent", status_code=204)
@@ -206,12 +237,8 @@ def permanent_delete_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC
     device = session.get(Device, device_id)
     if not device:
         raise HTTPException(status_code=404)
-    session.execute(sql_delete(ConfigSnapshot).where(ConfigSnapshot.device_id == device_id))
-    session.execute(sql_delete(ComplianceResult).where(ComplianceResult.device_id == device_id))
-    session.execute(sql_delete(BulkJobTarget).where(BulkJobTarget.device_id == device_id))
-    session.execute(sql_delete(DeviceMetric).where(DeviceMetric.device_id == device_id))
-    session.execute(sql_delete(DeviceBackupSettings).where(DeviceBackupSettings.device_id == device_id))
-    session.flush()
+    # Snapshots, compliance results, job targets, metrics and backup settings
+    # go with it via ON DELETE CASCADE.
     session.delete(device)
     session.commit()
     write_audit(session, "permanent_delete_device", current, "device", str(device_id),
@@ -221,7 +248,6 @@ def permanent_delete_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC
 @router.post("/{device_id}/diagnostics")
 def run_diagnostics(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentUser):
     """Run three sequential diagnostic steps: TCP connect, login, data transfer."""
-    import socket, time
     rbac.require("view_devices")
     device = session.get(Device, device_id)
     if not device:
@@ -233,12 +259,8 @@ def run_diagnostics(device_id: uuid.UUID, session: DBSession, rbac: RBAC, curren
     # ── Step 1: TCP / TLS connect ────────────────────────────────────────────
     t0 = time.monotonic()
     try:
-        import ssl
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
         with socket.create_connection((device.mgmt_ip, device.port), timeout=5) as sock:
-            with ctx.wrap_socket(sock, server_hostname=device.mgmt_ip):
+            with _PROBE_SSL_CONTEXT.wrap_socket(sock, server_hostname=device.mgmt_ip):
                 pass
         steps.append({"step": "TCP/TLS connect", "ok": True,
                        "detail": f"Reached {device.mgmt_ip}:{device.port}",
@@ -254,11 +276,11 @@ def run_diagnostics(device_id: uuid.UUID, session: DBSession, rbac: RBAC, curren
     t0 = time.monotonic()
     try:
         if hasattr(adapter, "diagnose_auth"):
-            login_attempts = adapter.diagnose_auth(device, creds)
+            login_attempts = _bounded(adapter.diagnose_auth, device, creds)
             success = any(a.get("success") for a in login_attempts)
             detail = next((f"{a['method']} {a['url']}" for a in login_attempts if a.get("success")), "All strategies failed")
         else:
-            result = adapter.test_connection(device, creds)
+            result = _bounded(adapter.test_connection, device, creds)
             success = result.get("success", False)
             detail = result.get("message", "")
         steps.append({"step": "Login", "ok": success, "detail": detail,
@@ -275,7 +297,7 @@ def run_diagnostics(device_id: uuid.UUID, session: DBSession, rbac: RBAC, curren
     # ── Step 3: Data transfer (fetch NTP section) ───────────────────────────
     t0 = time.monotonic()
     try:
-        data = adapter.fetch_config(device, creds, section="ntp")
+        data = _bounded(adapter.fetch_config, device, creds, section="ntp")
         steps.append({"step": "Data transfer (ntp)", "ok": True,
                        "detail": f"Received {len(str(data))} bytes",
                        "latency_ms": round((time.monotonic() - t0) * 1000, 1)})
@@ -335,16 +357,7 @@ def sync_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: C
         write_audit(None, "sync_device_failed", current, "device", str(device_id),
                     response_body={"error": str(exc)})
         raise HTTPException(status_code=502, detail=str(exc))
-    data_str = json.dumps(config)
-    checksum = hashlib.sha256(data_str.encode()).hexdigest()
-    latest = session.exec(
-        select(ConfigSnapshot)
-        .where(ConfigSnapshot.device_id == device_id)
-        .order_by(ConfigSnapshot.version.desc())
-    ).first()
-    version = (latest.version + 1) if latest else 1
-    session.add(ConfigSnapshot(device_id=device_id, data_json=data_str,
-                               checksum=checksum, version=version))
+    snap = store_snapshot(session, device_id, config, triggered_by="sync")
     device.status = "online"
     device.last_seen = datetime.now(timezone.utc)
     if isinstance(config, dict):
@@ -353,8 +366,9 @@ def sync_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: C
         if info.get("firmware_version"):
             device.firmware_version = info["firmware_version"]
     session.add(device)
+    session.flush()
+    resp = {"version": snap.version, "checksum": snap.checksum}
     session.commit()
-    resp = {"version": version, "checksum": checksum}
     write_audit(session, "sync_device", current, "device", str(device_id),
                 response_body=resp)
     return resp
@@ -364,12 +378,13 @@ def sync_device(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: C
 def list_snapshots(device_id: uuid.UUID, session: DBSession, rbac: RBAC, current: CurrentUser):
     rbac.require("view_devices")
     snaps = session.exec(
-        select(ConfigSnapshot)
+        select(ConfigSnapshot.id, ConfigSnapshot.version, ConfigSnapshot.checksum,
+               ConfigSnapshot.section, ConfigSnapshot.created_at)
         .where(ConfigSnapshot.device_id == device_id)
         .order_by(ConfigSnapshot.version.desc())
     ).all()
-    return [{"id": str(s.id), "version": s.version, "checksum": s.checksum,
-             "section": s.section, "created_at": s.created_at} for s in snaps]
+    return ORJSONResponse([{"id": str(s.id), "version": s.version, "checksum": s.checksum,
+                            "section": s.section, "created_at": s.created_at} for s in snaps])
 
 
 @router.get("/{device_id}/config")
@@ -419,7 +434,7 @@ def restore_snapshot(device_id: uuid.UUID, snapshot_id: uuid.UUID,
         raise HTTPException(status_code=404, detail="Snapshot not found")
 
     creds = decrypt_credentials(device.encrypted_credentials) if device.encrypted_credentials else {}
-    config = json.loads(snap.data_json)
+    config = orjson.loads(snap.data_json)
 
     try:
         result = get_adapter(device.adapter).restore_config(device, creds, config)
@@ -434,52 +449,88 @@ def restore_snapshot(device_id: uuid.UUID, snapshot_id: uuid.UUID,
     return result
 
 
+_IMPORT_CHUNK = 500
+
+
+def _insert_devices(session, rows: list[tuple[int, dict]], errors: list) -> int:
+    """
+    Insert (row_num, values) pairs in one statement inside a savepoint. On
+    failure, bisect to isolate the bad row(s) so errors still point at CSV
+    lines. Returns the number of rows inserted.
+    """
+    try:
+        with session.begin_nested():
+            session.execute(insert(Device), [values for _, values in rows])
+        return len(rows)
+    except Exception as exc:
+        if len(rows) == 1:
+            errors.append({"row": rows[0][0], "error": str(exc)})
+            return 0
+    mid = len(rows) // 2
+    return _insert_devices(session, rows[:mid], errors) + _insert_devices(session, rows[mid:], errors)
+
+
 @router.post("/import")
-async def import_devices_csv(
+def import_devices_csv(
     session: DBSession,
     rbac: RBAC,
     current: CurrentUser,
     file: UploadFile = File(...),
 ):
     rbac.require("edit_devices", "write")
-    content = await file.read()
-    text = content.decode("utf-8-sig")
-    reader = csv.DictReader(io.StringIO(text))
+    reader = csv.reader(codecs.iterdecode(file.file, "utf-8-sig"))
+    columns = {h.strip(): i for i, h in enumerate(next(reader, []))}
+
+    def cell(row: list, key: str) -> str:
+        i = columns.get(key)
+        return row[i].strip() if i is not None and i < len(row) else ""
 
-    created = 0
     errors = []
+    pending: list[tuple[int, dict]] = []
+    creds: list[tuple[str, str]] = []
+    now = datetime.now(timezone.utc)
 
+    # Validate everything up front; nothing touches the DB until the batch write
     for row_num, row in enumerate(reader, start=2):
+        if not row:
+            continue
         try:
-            name = row.get("name", "").strip()
-            mgmt_ip = row.get("mgmt_ip", "").strip()
+            name = cell(row, "name")
+            mgmt_ip = cell(row, "mgmt_ip")
             if not name or not mgmt_ip:
                 errors.append({"row": row_num, "error": "name and mgmt_ip are required"})
                 continue
 
-            model = row.get("model", "USG FLEX 100").strip() or "USG FLEX 100"
-            adapter = row.get("adapter", "mock").strip() or "mock"
-            port = int(row.get("port", 443) or 443)
-            protocol = row.get("protocol", "https").strip() or "https"
-            username = row.get("username", "admin").strip() or "admin"
-            password = row.get("password", "").strip()
-
-            device = Device(
-                name=name,
-                model=model,
-                mgmt_ip=mgmt_ip,
-                port=port,
-                protocol=protocol,
-                adapter=adapter,
-                encrypted_credentials=encrypt_credentials(username, password),
-                tags=json.dumps([]),
-            )
-            session.add(device)
-            session.commit()
-            created += 1
+            model = cell(row, "model") or "USG FLEX 100"
+            adapter = cell(row, "adapter") or "mock"
+            port = int(cell(row, "port") or 443)
+            protocol = cell(row, "protocol") or "https"
+            username = cell(row, "username") or "admin"
+            password = cell(row, "password")
+
+            pending.append((row_num, {
+                "name": name,
+                "model": model,
+                "mgmt_ip": mgmt_ip,
+                "port": port,
+                "protocol": protocol,
+                "adapter": adapter,
+                "tags": [],
+                "created_at": now,
+                "updated_at": now,
+            }))
+            creds.append((username, password))
         except Exception as exc:
             errors.append({"row": row_num, "error": str(exc)})
 
+    for (_, values), blob in zip(pending, encrypt_credentials_many(creds)):
+        values["encrypted_credentials"] = blob
+
+    created = 0
+    for i in range(0, len(pending), _IMPORT_CHUNK):
+        created += _insert_devices(session, pending[i:i + _IMPORT_CHUNK], errors)
+    session.commit()
+
     write_audit(session, "import_devices_csv", current, None, None,
                 {"created": created, "errors": len(errors)})
     return {"created": created, "errors": errors}
@@ -1,7 +1,8 @@
 import uuid
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import delete as sql_delete
+from sqlalchemy import delete as sql_delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import select
 from pydantic import BaseModel
 
@@ -22,11 +23,19 @@ def _group_dict(g: DeviceGroup, count: int) -> dict:
             "created_at": g.created_at, "device_count": count}
 
 
+def _member_count(session, group_id: uuid.UUID) -> int:
+    return session.exec(
+        select(func.count()).select_from(GroupMembership).where(GroupMembership.group_id == group_id)
+    ).one()
+
+
 @router.get("")
 def list_groups(session: DBSession, current: CurrentUser):
+    counts = dict(session.exec(
+        select(GroupMembership.group_id, func.count()).group_by(GroupMembership.group_id)
+    ).all())
     groups = session.exec(select(DeviceGroup)).all()
-    return [_group_dict(g, len(session.exec(
-        select(GroupMembership).where(GroupMembership.group_id == g.id)).all())) for g in groups]
+    return [_group_dict(g, counts.get(g.id, 0)) for g in groups]
 
 
 @router.post("", status_code=201)
@@ -47,7 +56,7 @@ def get_group(group_id: uuid.UUID, session: DBSession, current: CurrentUser):
     group = session.get(DeviceGroup, group_id)
     if not group:
         raise HTTPException(status_code=404)
-    count = len(session.exec(select(GroupMembership).where(GroupMembership.group_id == group_id)).all())
+    count = _member_count(session, group_id)
     return _group_dict(group, count)
 
 
@@ -61,7 +70,7 @@ def update_group(group_id: uuid.UUID, body: GroupCreate, session: DBSession, cur
     session.add(group)
     session.commit()
     session.refresh(group)
-    count = len(session.exec(select(GroupMembership).where(GroupMembership.group_id == group_id)).all())
+    count = _member_count(session, group_id)
     resp = _group_dict(group, count)
     write_audit(session, "update_group", current, "group", str(group_id),
                 request_body={"name": body.name, "description": body.description},
@@ -84,22 +93,29 @@ def delete_group(group_id: uuid.UUID, session: DBSession, current: SuperUser):
 
 @router.get("/{group_id}/devices")
 def get_group_devices(group_id: uuid.UUID, session: DBSession, current: CurrentUser):
-    memberships = session.exec(select(GroupMembership).where(GroupMembership.group_id == group_id)).all()
-    devices = [session.get(Device, m.device_id) for m in memberships]
+    devices = session.exec(
+        select(Device.id, Device.name, Device.model, Device.status)
+        .join(GroupMembership, GroupMembership.device_id == Device.id)
+        .where(GroupMembership.group_id == group_id)
+    ).all()
     return [{"id": str(d.id), "name": d.name, "model": d.model, "status": d.status}
-            for d in devices if d]
+            for d in devices]
 
 
 @router.post("/{group_id}/devices/{device_id}", status_code=204)
 def add_device(group_id: uuid.UUID, device_id: uuid.UUID, session: DBSession, current: SuperUser):
-    if not session.get(GroupMembership, {"device_id": device_id, "group_id": group_id}):
-        session.add(GroupMembership(device_id=device_id, group_id=group_id))
-        session.commit()
+    session.execute(
+        pg_insert(GroupMembership)
+        .values(device_id=device_id, group_id=group_id)
+        .on_conflict_do_nothing()
+    )
+    session.commit()
 
 
 @router.delete("/{group_id}/devices/{device_id}", status_code=204)
 def remove_device(group_id: uuid.UUID, device_id: uuid.UUID, session: DBSession, current: SuperUser):
-    link = session.get(GroupMembership, {"device_id": device_id, "group_id": group_id})
-    if link:
-        session.delete(link)
-        session.commit()
+    session.execute(
+        sql_delete(GroupMembership)
+        .where(GroupMembership.group_id == group_id, GroupMembership.device_id == device_id)
+    )
+    session.commit()
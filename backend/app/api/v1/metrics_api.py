@@ -1,9 +1,13 @@
 """Device metrics, health score, and interface status endpoints."""
-import json
 import uuid
 from datetime import datetime, timezone, timedelta
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+import sqlalchemy as sa
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import DBAPIError
 from sqlmodel import select
 
 from app.core.deps import CurrentUser, DBSession, RBAC
@@ -33,13 +37,17 @@ def get_device_metrics(
 ):
     rbac.require("view_devices")
     since = datetime.now(timezone.utc) - timedelta(hours=hours)
-    metrics = session.exec(
-        select(DeviceMetric)
+    # Newest `limit` points in the window, returned oldest first for charting
+    window = (
+        select(DeviceMetric.id, DeviceMetric.cpu_pct, DeviceMetric.memory_pct,
+               DeviceMetric.uptime_seconds, DeviceMetric.collected_at)
         .where(DeviceMetric.device_id == device_id, DeviceMetric.collected_at >= since)
         .order_by(DeviceMetric.collected_at.desc())
         .limit(limit)
-    ).all()
-    return [
+        .subquery()
+    )
+    metrics = session.exec(select(window).order_by(window.c.collected_at.asc())).all()
+    return ORJSONResponse([
         {
             "id": str(m.id),
             "cpu_pct": m.cpu_pct,
@@ -47,8 +55,8 @@ def get_device_metrics(
             "uptime_seconds": m.uptime_seconds,
             "collected_at": m.collected_at,
         }
-        for m in reversed(metrics)  # oldest first for charting
-    ]
+        for m in metrics
+    ])
 
 
 @router.get("/{device_id}/health")
@@ -75,11 +83,12 @@ def get_device_health(device_id: uuid.UUID, session: DBSession, rbac: RBAC, curr
             score += 25
 
     # 25 pts: compliance pass rate ≥ 80 %
-    results = session.exec(
-        select(ComplianceResult).where(ComplianceResult.device_id == device_id)
-    ).all()
-    if results:
-        pass_rate = sum(1 for r in results if r.passed) / len(results)
+    total, passed = session.exec(
+        select(func.count(), func.count().filter(ComplianceResult.passed == True))  # noqa: E712
+        .where(ComplianceResult.device_id == device_id)
+    ).one()
+    if total:
+        pass_rate = passed / total
         if pass_rate >= 0.8:
             score += 25
     else:
@@ -105,24 +114,31 @@ def get_device_interfaces(
 ):
     rbac.require("view_devices")
     # Try "full" section first, then any latest snapshot
-    snap = session.exec(
-        select(ConfigSnapshot)
+    snap_id = session.exec(
+        select(ConfigSnapshot.id)
         .where(ConfigSnapshot.device_id == device_id, ConfigSnapshot.section == "full")
         .order_by(ConfigSnapshot.version.desc())
+        .limit(1)
     ).first()
 
-    if not snap:
-        snap = session.exec(
-            select(ConfigSnapshot)
+    if not snap_id:
+        snap_id = session.exec(
+            select(ConfigSnapshot.id)
             .where(ConfigSnapshot.device_id == device_id)
             .order_by(ConfigSnapshot.version.desc())
+            .limit(1)
         ).first()
 
-    if not snap:
+    if not snap_id:
         return []
 
+    # Only the interfaces subtree leaves the database
     try:
-        data = json.loads(snap.data_json)
-        return data.get("interfaces", [])
-    except Exception:
+        interfaces = session.exec(
+            select(sa.cast(ConfigSnapshot.data_json, JSONB)["interfaces"])
+            .where(ConfigSnapshot.id == snap_id)
+        ).first()
+    except DBAPIError:
+        session.rollback()
         return []
+    return interfaces if interfaces is not None else []
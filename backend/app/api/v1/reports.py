@@ -1,10 +1,11 @@
 import csv
 import io
-import json
 import uuid
 from datetime import datetime
 from typing import List, Optional
 
+import orjson
+
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
 from sqlmodel import select
@@ -12,8 +13,8 @@ from pydantic import BaseModel
 
 from app.core.deps import CurrentUser, DBSession, RBAC
 from app.models.device import Device, GroupMembership
-from app.models.config import ConfigSnapshot
 from app.services.audit import write_audit
+from app.services.snapshots import latest_snapshots
 
 router = APIRouter()
 
@@ -42,21 +43,20 @@ def generate_report(body: ReportRequest, session: DBSession, rbac: RBAC, current
     if body.device_ids:
         device_ids.update(body.device_ids)
     if body.group_ids:
-        for gid in body.group_ids:
-            for m in session.exec(select(GroupMembership).where(GroupMembership.group_id == gid)).all():
-                device_ids.add(m.device_id)
-    if not device_ids:
-        device_ids = {d.id for d in session.exec(select(Device)).all()}
-
-    rows = []
-    for did in device_ids:
-        device = session.get(Device, did)
-        if not device:
-            continue
-        if body.tags:
-            dev_tags = json.loads(device.tags or "[]")
-            if not any(t in dev_tags for t in body.tags):
-                continue
+        device_ids.update(session.exec(
+            select(GroupMembership.device_id).where(GroupMembership.group_id.in_(body.group_ids))
+        ).all())
+
+    device_q = select(Device)
+    if device_ids:
+        device_q = device_q.where(Device.id.in_(device_ids))
+    devices = session.exec(device_q).all()
+    if body.tags:
+        devices = [d for d in devices if any(t in (d.tags or []) for t in body.tags)]
+
+    snap_map = latest_snapshots(session, (d.id for d in devices), body.sections)
+
+    def device_row(device: Device, decode) -> dict:
         row: dict = {
             "device_id": str(device.id), "device_name": device.name,
             "model": device.model, "mgmt_ip": device.mgmt_ip,
@@ -64,26 +64,38 @@ def generate_report(body: ReportRequest, session: DBSession, rbac: RBAC, current
             "last_seen": device.last_seen.isoformat() if device.last_seen else None,
         }
         for section in body.sections:
-            snap = session.exec(
-                select(ConfigSnapshot)
-                .where(ConfigSnapshot.device_id == did, ConfigSnapshot.section == section)
-                .order_by(ConfigSnapshot.version.desc())
-            ).first()
-            row[f"config_{section}"] = json.loads(snap.data_json) if snap else None
-        rows.append(row)
+            snap = snap_map.get((device.id, section))
+            row[f"config_{section}"] = decode(snap.data_json) if snap else None
+        return row
 
     if body.format == "csv":
-        buf = io.StringIO()
-        if rows:
-            flat = [{k: json.dumps(v) if isinstance(v, (dict, list)) else v
-                     for k, v in r.items()} for r in rows]
-            writer = csv.DictWriter(buf, fieldnames=flat[0].keys())
-            writer.writeheader()
-            writer.writerows(flat)
+        def csv_chunks():
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            for i, device in enumerate(devices):
+                # Stored snapshot payloads are already JSON text; write them as-is
+                row = device_row(device, str)
+                if not i:
+                    writer.writerow(row.keys())
+                writer.writerow(row.values())
+                yield buf.getvalue().encode()
+                buf.seek(0)
+                buf.truncate(0)
+
         return StreamingResponse(
-            io.BytesIO(buf.getvalue().encode()),
+            csv_chunks(),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=report.csv"},
         )
 
-    return {"generated_at": datetime.utcnow().isoformat(), "device_count": len(rows), "data": rows}
+    head = {"generated_at": datetime.utcnow().isoformat(), "device_count": len(devices)}
+
+    def json_chunks():
+        yield orjson.dumps(head)[:-1] + b',"data":['
+        for i, device in enumerate(devices):
+            # Stored snapshot payloads are spliced in without a decode/encode round trip
+            row = orjson.dumps(device_row(device, orjson.Fragment))
+            yield b"," + row if i else row
+        yield b"]}"
+
+    return StreamingResponse(json_chunks(), media_type="application/json")
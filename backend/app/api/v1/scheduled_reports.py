@@ -1,8 +1,8 @@
-import json
 import uuid
 from datetime import datetime, timezone
 from typing import List, Optional
 
+import orjson
 from croniter import croniter
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
@@ -46,10 +46,10 @@ def _report_dict(r: ScheduledReport) -> dict:
     return {
         "id": str(r.id),
         "name": r.name,
-        "device_ids": json.loads(r.device_ids or "[]"),
-        "group_ids": json.loads(r.group_ids or "[]"),
-        "tags": json.loads(r.tags or "[]"),
-        "sections": json.loads(r.sections or "[]"),
+        "device_ids": orjson.loads(r.device_ids or "[]"),
+        "group_ids": orjson.loads(r.group_ids or "[]"),
+        "tags": orjson.loads(r.tags or "[]"),
+        "sections": orjson.loads(r.sections or "[]"),
         "format": r.format,
         "cron_expression": r.cron_expression,
         "delivery_email": r.delivery_email,
@@ -78,10 +78,10 @@ def list_reports(current: CurrentUser, session: DBSession):
 def create_report(body: ScheduledReportCreate, current: CurrentUser, session: DBSession):
     report = ScheduledReport(
         name=body.name,
-        device_ids=json.dumps(body.device_ids),
-        group_ids=json.dumps(body.group_ids),
-        tags=json.dumps(body.tags),
-        sections=json.dumps(body.sections),
+        device_ids=orjson.dumps(body.device_ids).decode(),
+        group_ids=orjson.dumps(body.group_ids).decode(),
+        tags=orjson.dumps(body.tags).decode(),
+        sections=orjson.dumps(body.sections).decode(),
         format=body.format,
         cron_expression=body.cron_expression,
         delivery_email=body.delivery_email,
@@ -107,13 +107,13 @@ def update_report(report_id: uuid.UUID, body: ScheduledReportUpdate,
     if body.name is not None:
         report.name = body.name
     if body.device_ids is not None:
-        report.device_ids = json.dumps(body.device_ids)
+        report.device_ids = orjson.dumps(body.device_ids).decode()
     if body.group_ids is not None:
-        report.group_ids = json.dumps(body.group_ids)
+        report.group_ids = orjson.dumps(body.group_ids).decode()
     if body.tags is not None:
-        report.tags = json.dumps(body.tags)
+        report.tags = orjson.dumps(body.tags).decode()
     if body.sections is not None:
-        report.sections = json.dumps(body.sections)
+        report.sections = orjson.dumps(body.sections).decode()
     if body.format is not None:
         report.format = body.format
     if body.cron_expression is not None:
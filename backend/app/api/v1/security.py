@@ -1,11 +1,14 @@
-import json
+import base64
 import uuid
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
 
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel
+from sqlalchemy import func, tuple_
 from sqlmodel import select
 
 from app.core.deps import CurrentUser, DBSession
@@ -13,6 +16,7 @@ from app.models.security import SecurityFinding, SecurityScan, DeviceRiskScore,
 from app.models.device import Device
 from app.models.user import User
 from app.services.audit import write_audit
+from app.services.security_analyzer import score_grade
 
 router = APIRouter()
 
@@ -39,6 +43,18 @@ class TriggerScanBody(BaseModel):
 # Helper serialisers
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=1024)
+def _load_json(raw: str):
+    """
+    Parse a finding's JSON column, memoised on the raw text.
+
+    The same rule emits the same remediation patch and compliance refs on
+    every device, so listings decode a handful of distinct strings many
+    times. Results are shared: treat them as read-only.
+    """
+    return orjson.loads(raw)
+
+
 def _finding_dict(f: SecurityFinding, device_name: Optional[str] = None) -> dict:
     return {
         "id": str(f.id),
@@ -49,11 +65,11 @@ def _finding_dict(f: SecurityFinding, device_name: Optional[str] = None) -> dict
         "title": f.title,
         "description": f.description,
         "recommendation": f.recommendation,
-        "remediation_patch": json.loads(f.remediation_patch) if f.remediation_patch else None,
+        "remediation_patch": _load_json(f.remediation_patch) if f.remediation_patch else None,
         "config_path": f.config_path,
         "status": f.status,
         "suppressed_reason": f.suppressed_reason,
-        "compliance_refs": json.loads(f.compliance_refs) if f.compliance_refs else [],
+        "compliance_refs": _load_json(f.compliance_refs) if f.compliance_refs else [],
         "first_seen": f.first_seen,
         "last_seen": f.last_seen,
         "resolved_at": f.resolved_at,
@@ -116,12 +132,50 @@ def _exclusion_dict(e: SecurityFindingExclusion, device_name: Optional[str] = No
     }
 
 
+def _device_names(session, ids) -> dict[str, str]:
+    """Map str(device id) -> name for just the given ids."""
+    ids = {i for i in ids if i}
+    if not ids:
+        return {}
+    rows = session.exec(select(Device.id, Device.name).where(Device.id.in_(ids))).all()
+    return {str(did): name for did, name in rows}
+
+
+def _usernames(session, ids) -> dict[str, str]:
+    """Map str(user id) -> username for just the given ids."""
+    ids = {i for i in ids if i}
+    if not ids:
+        return {}
+    rows = session.exec(select(User.id, User.username).where(User.id.in_(ids))).all()
+    return {str(uid): username for uid, username in rows}
+
+
+def _latest_scores():
+    """
+    Subquery of the id of each device's newest risk score. Scores calculated
+    at the same instant are ranked by id, so every device yields exactly one.
+    """
+    ranked = select(
+        DeviceRiskScore.id,
+        func.row_number().over(
+            partition_by=DeviceRiskScore.device_id,
+            order_by=(DeviceRiskScore.calculated_at.desc(), DeviceRiskScore.id.desc()),
+        ).label("rank"),
+    ).subquery()
+    return select(ranked.c.id).where(ranked.c.rank == 1).subquery()
+
+
+def _join_latest(stmt, latest):
+    return stmt.join(latest, DeviceRiskScore.id == latest.c.id)
+
+
 # ---------------------------------------------------------------------------
 # Findings endpoints
 # ---------------------------------------------------------------------------
 
 @router.get("/findings")
 def list_findings(
+    response: Response,
     current: CurrentUser,
     session: DBSession,
     device_id: Optional[str] = None,
@@ -129,8 +183,22 @@ def list_findings(
     status: Optional[str] = None,
     category: Optional[str] = None,
     scan_id: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=5000),
+    after: Optional[str] = Query(default=None, description="Keyset cursor from the X-Next-Cursor header"),
 ):
-    q = select(SecurityFinding)
+    """
+    Findings ordered by severity, title and id, at most ``limit`` per call.
+
+    When more rows follow, the response carries an ``X-Next-Cursor`` header;
+    pass its value as ``after`` to fetch the next page. No header means the
+    listing is complete.
+    """
+    sort_key = (SecurityFinding.severity_rank, SecurityFinding.title, SecurityFinding.id)
+    # Plain column rows: the _*_dict helpers only read attributes, so no ORM
+    # instances are built for listings.
+    q = select(*SecurityFinding.__table__.c, Device.name.label("device_name")).join(
+        Device, Device.id == SecurityFinding.device_id, isouter=True
+    )
     if device_id:
         q = q.where(SecurityFinding.device_id == uuid.UUID(device_id))
     if severity:
@@ -141,11 +209,28 @@ def list_findings(
         q = q.where(SecurityFinding.category == category)
     if scan_id:
         q = q.where(SecurityFinding.scan_id == uuid.UUID(scan_id))
-    q = q.order_by(SecurityFinding.severity, SecurityFinding.title)
+    if after is not None:
+        q = q.where(tuple_(*sort_key) > tuple_(*_decode_cursor(after)))
+    rows = session.exec(q.order_by(*sort_key).limit(limit + 1)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    return [_finding_dict(row, row.device_name) for row in rows]
 
-    findings = session.exec(q).all()
-    devices = {str(d.id): d.name for d in session.exec(select(Device)).all()}
-    return [_finding_dict(f, devices.get(str(f.device_id))) for f in findings]
+
+def _encode_cursor(row) -> str:
+    """Opaque keyset cursor holding the (severity_rank, title, id) sort key of ``row``."""
+    key = orjson.dumps([row.severity_rank, row.title, str(row.id)])
+    return base64.urlsafe_b64encode(key).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        rank, title, finding_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(rank), str(title), uuid.UUID(finding_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.get("/findings/{finding_id}")
@@ -236,7 +321,7 @@ def remediate_finding(finding_id: uuid.UUID, current: CurrentUser, session: DBSe
         raise HTTPException(status_code=400, detail="No remediation patch available for this finding")
 
     try:
-        patch_data = json.loads(f.remediation_patch)
+        patch_data = _load_json(f.remediation_patch)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid remediation patch JSON")
 
@@ -244,7 +329,7 @@ def remediate_finding(finding_id: uuid.UUID, current: CurrentUser, session: DBSe
     job = BulkJob(
         name=f"Remediate: {f.title[:80]}",
         section=patch_data.get("section", "firewall_rules"),
-        patch_json=json.dumps(patch_data.get("patch", {})),
+        patch_json=orjson.dumps(patch_data.get("patch", {})).decode(),
         status="pending",
         created_by=current.id,
     )
@@ -268,17 +353,15 @@ def remediate_finding(finding_id: uuid.UUID, current: CurrentUser, session: DBSe
 @router.get("/scans")
 def list_scans(current: CurrentUser, session: DBSession):
     scans = session.exec(
-        select(SecurityScan).order_by(SecurityScan.started_at.desc()).limit(50)
-    ).all()
-    devices = {str(d.id): d.name for d in session.exec(select(Device)).all()}
-    users = {str(u.id): u.username for u in session.exec(select(User)).all()}
+        select(*SecurityScan.__table__.c, Device.name.label("device_name"), User.username)
+        .join(Device, Device.id == SecurityScan.device_id, isouter=True)
+        .join(User, User.id == SecurityScan.triggered_by_user, isouter=True)
+        .order_by(SecurityScan.started_at.desc())
+        .limit(50)
+    )
     return [
-        _scan_dict(
-            s,
-            device_name=devices.get(str(s.device_id)) if s.device_id else None,
-            triggered_by_username=users.get(str(s.triggered_by_user)) if s.triggered_by_user else None,
-        )
-        for s in scans
+        _scan_dict(row, device_name=row.device_name, triggered_by_username=row.username)
+        for row in scans
     ]
 
 
@@ -287,12 +370,12 @@ def get_scan(scan_id: uuid.UUID, current: CurrentUser, session: DBSession):
     s = session.get(SecurityScan, scan_id)
     if not s:
         raise HTTPException(status_code=404)
-    devices = {str(d.id): d.name for d in session.exec(select(Device)).all()}
-    users = {str(u.id): u.username for u in session.exec(select(User)).all()}
+    device = session.get(Device, s.device_id) if s.device_id else None
+    user = session.get(User, s.triggered_by_user) if s.triggered_by_user else None
     return _scan_dict(
         s,
-        device_name=devices.get(str(s.device_id)) if s.device_id else None,
-        triggered_by_username=users.get(str(s.triggered_by_user)) if s.triggered_by_user else None,
+        device_name=device.name if device else None,
+        triggered_by_username=user.username if user else None,
     )
 
 
@@ -338,18 +421,12 @@ def cancel_scan(scan_id: uuid.UUID, current: CurrentUser, session: DBSession):
 
 @router.get("/scores")
 def list_scores(current: CurrentUser, session: DBSession):
-    devices = {str(d.id): d.name for d in session.exec(select(Device)).all()}
-    # Latest score per device
-    seen: set[str] = set()
-    results = []
-    for s in session.exec(
-        select(DeviceRiskScore).order_by(DeviceRiskScore.calculated_at.desc())
-    ).all():
-        did = str(s.device_id)
-        if did not in seen:
-            seen.add(did)
-            results.append(_score_dict(s, devices.get(did)))
-    return results
+    latest = session.exec(
+        _join_latest(select(*DeviceRiskScore.__table__.c, Device.name.label("device_name")), _latest_scores())
+        .join(Device, Device.id == DeviceRiskScore.device_id, isouter=True)
+        .order_by(DeviceRiskScore.calculated_at.desc())
+    )
+    return [_score_dict(row, row.device_name) for row in latest]
 
 
 @router.get("/scores/{device_id}")
@@ -372,42 +449,37 @@ def get_device_scores(device_id: uuid.UUID, current: CurrentUser, session: DBSes
 
 @router.get("/summary")
 def get_summary(current: CurrentUser, session: DBSession):
-    # All open findings
-    open_findings = session.exec(
-        select(SecurityFinding).where(SecurityFinding.status == "open")
-    ).all()
-
+    # One GROUP BY over both keys; the handful of (severity, category) rows
+    # is folded into the two breakdowns here.
     by_severity: dict[str, int] = {}
     by_category: dict[str, int] = {}
-    for f in open_findings:
-        by_severity[f.severity] = by_severity.get(f.severity, 0) + 1
-        by_category[f.category] = by_category.get(f.category, 0) + 1
-
-    # Fleet score = average of latest score per device
-    devices = session.exec(select(Device).where(Device.deleted_at == None)).all()  # noqa: E711
-    seen_devices: set[str] = set()
-    scores: list[int] = []
-    for s in session.exec(
-        select(DeviceRiskScore).order_by(DeviceRiskScore.calculated_at.desc())
-    ).all():
-        did = str(s.device_id)
-        if did not in seen_devices:
-            seen_devices.add(did)
-            scores.append(s.score)
-
-    fleet_score = round(sum(scores) / len(scores)) if scores else 100
-    fleet_grade = (
-        "A" if fleet_score >= 90 else
-        "B" if fleet_score >= 75 else
-        "C" if fleet_score >= 50 else
-        "D" if fleet_score >= 25 else "F"
-    )
+    for severity, category, n in session.exec(
+        select(SecurityFinding.severity, SecurityFinding.category, func.count())
+        .where(SecurityFinding.status == "open")
+        .group_by(SecurityFinding.severity, SecurityFinding.category)
+    ):
+        by_severity[severity] = by_severity.get(severity, 0) + n
+        by_category[category] = by_category.get(category, 0) + n
+
+    # Active device count and fleet score (average of the latest score per
+    # device) in one round trip
+    device_count, avg_score = session.exec(
+        select(
+            select(func.count()).select_from(Device)
+            .where(Device.deleted_at == None)  # noqa: E711
+            .scalar_subquery(),
+            _join_latest(select(func.avg(DeviceRiskScore.score)), _latest_scores())
+            .scalar_subquery(),
+        )
+    ).one()
+    fleet_score = round(float(avg_score)) if avg_score is not None else 100
+    fleet_grade = score_grade(fleet_score)
 
     return {
         "fleet_score": fleet_score,
         "fleet_grade": fleet_grade,
-        "total_open": len(open_findings),
-        "device_count": len(devices),
+        "total_open": sum(by_severity.values()),
+        "device_count": device_count,
         "by_severity": by_severity,
         "by_category": by_category,
     }
@@ -428,8 +500,8 @@ def list_exclusions(
         q = q.where(SecurityFindingExclusion.device_id == uuid.UUID(device_id))
     q = q.order_by(SecurityFindingExclusion.created_at.desc())
     exclusions = session.exec(q).all()
-    devices = {str(d.id): d.name for d in session.exec(select(Device)).all()}
-    users = {str(u.id): u.username for u in session.exec(select(User)).all()}
+    devices = _device_names(session, (e.device_id for e in exclusions))
+    users = _usernames(session, (e.created_by for e in exclusions))
     return [
         _exclusion_dict(
             e,
@@ -485,9 +557,8 @@ def create_exclusion(body: ExcludeBody, current: CurrentUser, session: DBSession
     write_audit(session, "create_finding_exclusion", current, "security_finding_exclusion",
                 str(excl.id), {"device_id": body.device_id, "finding_title": body.finding_title, "reason": body.reason})
 
-    users = {str(u.id): u.username for u in session.exec(select(User)).all()}
     return _exclusion_dict(excl, device_name=device.name,
-                           created_by_username=users.get(str(current.id)))
+                           created_by_username=current.username)
 
 
 @router.delete("/exclusions/{exclusion_id}", status_code=200)
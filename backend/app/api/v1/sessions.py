@@ -3,6 +3,7 @@ import uuid
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException
+from sqlalchemy import update
 from sqlmodel import select
 
 from app.core.deps import CurrentUser, DBSession
@@ -27,7 +28,11 @@ def _session_dict(rt: RefreshToken) -> dict:
 def list_sessions(current: CurrentUser, session: DBSession):
     """List all active (non-revoked, non-expired) sessions for the current user."""
     tokens = session.exec(
-        select(RefreshToken)
+        select(
+            RefreshToken.id, RefreshToken.user_agent, RefreshToken.ip_address,
+            RefreshToken.created_at, RefreshToken.last_used_at, RefreshToken.expires_at,
+            RefreshToken.revoked,
+        )
         .where(
             RefreshToken.user_id == current.id,
             RefreshToken.revoked == False,
@@ -52,13 +57,12 @@ def revoke_session(session_id: uuid.UUID, current: CurrentUser, session: DBSessi
 @router.delete("", status_code=204)
 def revoke_all_sessions(current: CurrentUser, session: DBSession):
     """Revoke all active sessions for the current user."""
-    tokens = session.exec(
-        select(RefreshToken).where(
+    session.execute(
+        update(RefreshToken)
+        .where(
             RefreshToken.user_id == current.id,
             RefreshToken.revoked == False,
         )
-    ).all()
-    for token in tokens:
-        token.revoked = True
-        session.add(token)
+        .values(revoked=True)
+    )
     session.commit()
@@ -92,20 +92,26 @@ def list_entries(
 @router.get("/summary")
 def get_syslog_summary(current: CurrentUser, session: DBSession):
     cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-    entries = session.exec(
-        select(SyslogEntry).where(SyslogEntry.received_at >= cutoff)
+    counts = session.exec(
+        select(SyslogEntry.severity, sa.func.count())
+        .where(SyslogEntry.received_at >= cutoff)
+        .group_by(SyslogEntry.severity)
     ).all()
+    devices_sending = session.exec(
+        select(sa.func.count(sa.distinct(SyslogEntry.device_id)))
+        .where(SyslogEntry.received_at >= cutoff)
+    ).one()
 
-    total = len(entries)
+    total = 0
     by_severity = {}
-    for e in entries:
-        name = SEVERITY_NAMES.get(e.severity, "unknown")
-        by_severity[name] = by_severity.get(name, 0) + 1
+    for severity, n in counts:
+        name = SEVERITY_NAMES.get(severity, "unknown")
+        by_severity[name] = by_severity.get(name, 0) + n
+        total += n
 
-    device_ids = {e.device_id for e in entries if e.device_id}
     return {
         "total_24h": total,
-        "devices_sending": len(device_ids),
+        "devices_sending": devices_sending,
         "by_severity": by_severity,
     }
 
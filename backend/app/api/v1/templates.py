@@ -1,8 +1,9 @@
-import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timezone
 from typing import Optional, List
 
+import orjson
 from fastapi import APIRouter, HTTPException
 from sqlmodel import select
 from pydantic import BaseModel
@@ -16,6 +17,12 @@ from app.adapters.registry import get_adapter
 
 router = APIRouter()
 
+# Devices are independent targets, so a template is pushed to them in parallel.
+_APPLY_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="template-apply")
+# How long to wait for each device. A device that has not answered by then is
+# reported as failed; its call is abandoned, not cancelled.
+_APPLY_TIMEOUT = 60
+
 
 class TemplateCreate(BaseModel):
     name: str
@@ -50,15 +57,15 @@ def _tmpl_dict(t: ConfigTemplate) -> dict:
 
 @router.get("")
 def list_templates(session: DBSession, current: CurrentUser):
-    templates = session.exec(select(ConfigTemplate)).all()
+    templates = session.exec(select(*ConfigTemplate.__table__.c)).all()
     return [_tmpl_dict(t) for t in templates]
 
 
 @router.post("", status_code=201)
 def create_template(body: TemplateCreate, session: DBSession, current: CurrentUser):
     try:
-        json.loads(body.data_json)
-    except json.JSONDecodeError:
+        orjson.loads(body.data_json)
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=422, detail="data_json must be valid JSON")
 
     t = ConfigTemplate(
@@ -99,8 +106,8 @@ def update_template(template_id: uuid.UUID, body: TemplateUpdate,
         t.section = body.section
     if body.data_json is not None:
         try:
-            json.loads(body.data_json)
-        except json.JSONDecodeError:
+            orjson.loads(body.data_json)
+        except orjson.JSONDecodeError:
             raise HTTPException(status_code=422, detail="data_json must be valid JSON")
         t.data_json = body.data_json
     t.updated_at = datetime.now(timezone.utc)
@@ -130,26 +137,37 @@ def apply_template(template_id: uuid.UUID, body: ApplyRequest,
     if not t:
         raise HTTPException(status_code=404)
 
-    patch = json.loads(t.data_json)
-    success = []
-    failed = []
+    patch = orjson.loads(t.data_json)
+    section = t.section
 
+    device_ids: dict[str, uuid.UUID] = {}
+    failed = []
     for device_id_str in body.device_ids:
         try:
-            device_id = uuid.UUID(device_id_str)
+            device_ids[device_id_str] = uuid.UUID(device_id_str)
         except ValueError:
             failed.append({"device_id": device_id_str, "error": "Invalid device ID"})
-            continue
 
-        device = session.get(Device, device_id)
+    devices = {
+        d.id: d for d in session.exec(select(Device).where(Device.id.in_(device_ids.values()))).all()
+    } if device_ids else {}
+
+    def apply_one(device: Device) -> dict:
+        creds = decrypt_credentials(device.encrypted_credentials)
+        return get_adapter(device.adapter).apply_patch(device, creds, section, patch)
+
+    futures = {}
+    for device_id_str, device_id in device_ids.items():
+        device = devices.get(device_id)
         if not device:
             failed.append({"device_id": device_id_str, "error": "Device not found"})
             continue
+        futures[device_id_str] = (device, _APPLY_POOL.submit(apply_one, device))
 
+    success = []
+    for device_id_str, (device, future) in futures.items():
         try:
-            creds = decrypt_credentials(device.encrypted_credentials)
-            adapter = get_adapter(device.adapter)
-            result = adapter.apply_patch(device, creds, t.section, patch)
+            result = future.result(timeout=_APPLY_TIMEOUT)
             if result.get("success"):
                 success.append({"device_id": device_id_str, "device_name": device.name})
             else:
@@ -158,6 +176,12 @@ def apply_template(template_id: uuid.UUID, body: ApplyRequest,
                     "device_name": device.name,
                     "error": result.get("message", "Unknown error"),
                 })
+        except FutureTimeout:
+            failed.append({
+                "device_id": device_id_str,
+                "device_name": device.name,
+                "error": f"No response within {_APPLY_TIMEOUT} s",
+            })
         except Exception as e:
             failed.append({
                 "device_id": device_id_str,
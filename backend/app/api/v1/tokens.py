@@ -1,4 +1,3 @@
-import hashlib
 import secrets
 import uuid
 from datetime import datetime, timezone
@@ -8,7 +7,9 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from app.core.deps import CurrentUser, DBSession
+from app.core.security import hash_api_token
 from app.models.token import ApiToken
+from app.services import token_cache
 from app.services.audit import write_audit
 from sqlmodel import select
 
@@ -23,7 +24,12 @@ class TokenCreate(BaseModel):
 @router.get("")
 def list_tokens(current: CurrentUser, session: DBSession):
     tokens = session.exec(
-        select(ApiToken).where(ApiToken.user_id == current.id)
+        select(
+            ApiToken.id, ApiToken.name, ApiToken.prefix, ApiToken.expires_at,
+            ApiToken.last_used_at, ApiToken.revoked, ApiToken.created_at,
+        )
+        .where(ApiToken.user_id == current.id)
+        .order_by(ApiToken.created_at.desc())
     ).all()
     return [_token_dict(t) for t in tokens]
 
@@ -32,7 +38,7 @@ def list_tokens(current: CurrentUser, session: DBSession):
 def create_token(body: TokenCreate, current: CurrentUser, session: DBSession):
     raw = "ztm_" + secrets.token_urlsafe(32)
     prefix = raw[:8]
-    token_hash = hashlib.sha256(raw.encode()).hexdigest()
+    token_hash = hash_api_token(raw)
 
     token = ApiToken(
         user_id=current.id,
@@ -64,6 +70,7 @@ def revoke_token(token_id: uuid.UUID, current: CurrentUser, session: DBSession):
     token.revoked = True
     session.add(token)
     session.commit()
+    token_cache.invalidate(token.token_hash)
     write_audit(session, "revoke_api_token", current, "api_token", str(token_id), {})
 
 
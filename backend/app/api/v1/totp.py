@@ -3,6 +3,12 @@ from pydantic import BaseModel
 from fastapi import APIRouter, HTTPException
 
 from app.core.deps import CurrentUser, DBSession
+from app.services import user_cache
+
+try:
+    import pyotp
+except ImportError:
+    pyotp = None
 
 router = APIRouter()
 
@@ -11,13 +17,20 @@ class TOTPCodeBody(BaseModel):
     code: str
 
 
+def _require_pyotp() -> None:
+    if pyotp is None:
+        raise HTTPException(status_code=500, detail="pyotp not installed")
+
+
+def _check_code(secret: str, code: str) -> None:
+    if not pyotp.TOTP(secret).verify(code, valid_window=1):
+        raise HTTPException(status_code=400, detail="Invalid TOTP code")
+
+
 @router.get("/setup")
 def totp_setup(current: CurrentUser, session: DBSession):
     """Generate a new TOTP secret and provisioning URI. Does not enable 2FA yet."""
-    try:
-        import pyotp
-    except ImportError:
-        raise HTTPException(status_code=500, detail="pyotp not installed")
+    _require_pyotp()
 
     if current.totp_enabled:
         raise HTTPException(status_code=400, detail="TOTP already enabled")
@@ -30,6 +43,7 @@ def totp_setup(current: CurrentUser, session: DBSession):
     current.totp_secret = secret
     session.add(current)
     session.commit()
+    user_cache.invalidate(current.id)
 
     return {"secret": secret, "uri": uri}
 
@@ -37,41 +51,33 @@ def totp_setup(current: CurrentUser, session: DBSession):
 @router.post("/verify")
 def totp_verify(body: TOTPCodeBody, current: CurrentUser, session: DBSession):
     """Verify the TOTP code and activate 2FA for the account."""
-    try:
-        import pyotp
-    except ImportError:
-        raise HTTPException(status_code=500, detail="pyotp not installed")
+    _require_pyotp()
 
     if not current.totp_secret:
         raise HTTPException(status_code=400, detail="No TOTP secret set up. Call /auth/totp/setup first.")
 
-    totp = pyotp.TOTP(current.totp_secret)
-    if not totp.verify(body.code, valid_window=1):
-        raise HTTPException(status_code=400, detail="Invalid TOTP code")
+    _check_code(current.totp_secret, body.code)
 
     current.totp_enabled = True
     session.add(current)
     session.commit()
+    user_cache.invalidate(current.id)
     return {"enabled": True}
 
 
 @router.delete("/disable")
 def totp_disable(body: TOTPCodeBody, current: CurrentUser, session: DBSession):
     """Disable TOTP after verifying the current code."""
-    try:
-        import pyotp
-    except ImportError:
-        raise HTTPException(status_code=500, detail="pyotp not installed")
+    _require_pyotp()
 
     if not current.totp_enabled:
         raise HTTPException(status_code=400, detail="TOTP is not enabled")
 
-    totp = pyotp.TOTP(current.totp_secret)
-    if not totp.verify(body.code, valid_window=1):
-        raise HTTPException(status_code=400, detail="Invalid TOTP code")
+    _check_code(current.totp_secret, body.code)
 
     current.totp_enabled = False
     current.totp_secret = None
     session.add(current)
     session.commit()
+    user_cache.invalidate(current.id)
     return {"enabled": False}
@@ -3,12 +3,15 @@ from datetime import datetime, timezone
 from typing import Optional, List
 
 from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import delete as sql_delete, insert, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import select
 from pydantic import BaseModel
 
 from app.core.deps import CurrentUser, SuperUser, DBSession
 from app.models.user import User, Role, Permission, UserRole
 from app.core.security import hash_password
+from app.services import user_cache
 from app.services.audit import write_audit
 
 router = APIRouter()
@@ -44,27 +47,38 @@ class PermissionSchema(BaseModel):
 
 @router.get("", response_model=List[dict])
 def list_users(session: DBSession, current: SuperUser):
-    users = session.exec(select(User)).all()
-    return [{"id": str(u.id), "email": u.email, "username": u.username,
+    users = session.exec(
+        select(User.id, User.email, User.username, User.full_name,
+               User.is_active, User.is_superuser, User.created_at)
+    ).all()
+    return [{"id": u.id, "email": u.email, "username": u.username,
              "full_name": u.full_name, "is_active": u.is_active,
              "is_superuser": u.is_superuser, "created_at": u.created_at} for u in users]
 
 
 @router.post("", status_code=201)
 def create_user(body: UserCreate, session: DBSession, current: SuperUser):
-    if session.exec(select(User).where(User.email == body.email)).first():
-        raise HTTPException(status_code=409, detail="Email already in use")
-    if session.exec(select(User).where(User.username == body.username)).first():
-        raise HTTPException(status_code=409, detail="Username already in use")
-    user = User(email=body.email, username=body.username, full_name=body.full_name,
-                hashed_password=hash_password(body.password), is_superuser=body.is_superuser)
-    session.add(user)
+    # Reject known duplicates before paying for the Argon2 hash; the
+    # ON CONFLICT below still covers a concurrent insert.
+    _check_user_conflict(session, body.email, body.username)
+    now = datetime.now(timezone.utc)
+    user_id = session.execute(
+        pg_insert(User)
+        .values(id=uuid.uuid4(), email=body.email, username=body.username,
+                full_name=body.full_name, hashed_password=hash_password(body.password),
+                is_active=True, is_superuser=body.is_superuser,
+                created_at=now, updated_at=now, totp_enabled=False)
+        .on_conflict_do_nothing()
+        .returning(User.id)
+    ).scalar()
+    if user_id is None:
+        _check_user_conflict(session, body.email, body.username)
+        raise HTTPException(status_code=409, detail="Email or username already in use")
     session.commit()
-    session.refresh(user)
-    resp = {"id": str(user.id), "email": user.email, "username": user.username,
-            "full_name": user.full_name, "is_active": user.is_active,
-            "is_superuser": user.is_superuser, "created_at": str(user.created_at)}
-    write_audit(session, "create_user", current, "user", str(user.id),
+    resp = {"id": str(user_id), "email": body.email, "username": body.username,
+            "full_name": body.full_name, "is_active": True,
+            "is_superuser": body.is_superuser, "created_at": str(now)}
+    write_audit(session, "create_user", current, "user", str(user_id),
                 request_body={"email": body.email, "username": body.username,
                               "full_name": body.full_name, "is_superuser": body.is_superuser,
                               "password": body.password},
@@ -72,12 +86,22 @@ def create_user(body: UserCreate, session: DBSession, current: SuperUser):
     return resp
 
 
+def _check_user_conflict(session, email: str, username: str) -> None:
+    taken = session.exec(
+        select(User.email).where(or_(User.email == email, User.username == username))
+    ).all()
+    if any(t == email for t in taken):
+        raise HTTPException(status_code=409, detail="Email already in use")
+    if taken:
+        raise HTTPException(status_code=409, detail="Username already in use")
+
+
 @router.get("/{user_id}")
 def get_user(user_id: uuid.UUID, session: DBSession, current: SuperUser):
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404)
-    return {"id": str(user.id), "email": user.email, "username": user.username,
+    return {"id": user.id, "email": user.email, "username": user.username,
             "full_name": user.full_name, "is_active": user.is_active,
             "is_superuser": user.is_superuser, "created_at": user.created_at}
 
@@ -100,6 +124,7 @@ def update_user(user_id: uuid.UUID, body: UserUpdate, session: DBSession, curren
     user.updated_at = datetime.now(timezone.utc)
     session.add(user)
     session.commit()
+    user_cache.invalidate(user_id)
     session.refresh(user)
     resp = {"id": str(user.id), "email": user.email, "username": user.username,
             "full_name": user.full_name, "is_active": user.is_active,
@@ -119,33 +144,39 @@ def delete_user(user_id: uuid.UUID, session: DBSession, current: SuperUser):
                 request_body={"user_id": str(user_id), "username": user.username})
     session.delete(user)
     session.commit()
+    user_cache.invalidate(user_id)
 
 
 @router.get("/{user_id}/roles")
 def get_user_roles(user_id: uuid.UUID, session: DBSession, current: SuperUser):
     roles = session.exec(
-        select(Role).join(UserRole, UserRole.role_id == Role.id)
+        select(Role.id, Role.name, Role.description, Role.created_at)
+        .join(UserRole, UserRole.role_id == Role.id)
         .where(UserRole.user_id == user_id)
     ).all()
-    return [{"id": str(r.id), "name": r.name, "description": r.description,
+    return [{"id": r.id, "name": r.name, "description": r.description,
              "created_at": r.created_at} for r in roles]
 
 
 @router.post("/{user_id}/roles/{role_id}", status_code=204)
 def assign_role(user_id: uuid.UUID, role_id: uuid.UUID, session: DBSession, current: SuperUser):
-    if not session.get(UserRole, {"user_id": user_id, "role_id": role_id}):
-        session.add(UserRole(user_id=user_id, role_id=role_id))
-        session.commit()
+    session.execute(
+        pg_insert(UserRole)
+        .values(user_id=user_id, role_id=role_id, assigned_at=datetime.now(timezone.utc))
+        .on_conflict_do_nothing()
+    )
+    session.commit()
     write_audit(session, "assign_role", current, "user", str(user_id),
                 request_body={"user_id": str(user_id), "role_id": str(role_id)})
 
 
 @router.delete("/{user_id}/roles/{role_id}", status_code=204)
 def remove_role(user_id: uuid.UUID, role_id: uuid.UUID, session: DBSession, current: SuperUser):
-    link = session.get(UserRole, {"user_id": user_id, "role_id": role_id})
-    if link:
-        session.delete(link)
-        session.commit()
+    session.execute(
+        sql_delete(UserRole)
+        .where(UserRole.user_id == user_id, UserRole.role_id == role_id)
+    )
+    session.commit()
     write_audit(session, "remove_role", current, "user", str(user_id),
                 request_body={"user_id": str(user_id), "role_id": str(role_id)})
 
@@ -154,8 +185,8 @@ def remove_role(user_id: uuid.UUID, role_id: uuid.UUID, session: DBSession, curr
 
 @router.get("/roles/all")
 def list_roles(session: DBSession, current: CurrentUser):
-    roles = session.exec(select(Role)).all()
-    return [{"id": str(r.id), "name": r.name, "description": r.description,
+    roles = session.exec(select(Role.id, Role.name, Role.description, Role.created_at)).all()
+    return [{"id": r.id, "name": r.name, "description": r.description,
              "created_at": r.created_at} for r in roles]
 
 
@@ -186,7 +217,11 @@ def delete_role(role_id: uuid.UUID, session: DBSession, current: SuperUser):
 
 @router.get("/roles/{role_id}/permissions")
 def get_permissions(role_id: uuid.UUID, session: DBSession, current: CurrentUser):
-    perms = session.exec(select(Permission).where(Permission.role_id == role_id)).all()
+    perms = session.exec(
+        select(Permission.feature, Permission.resource_type,
+               Permission.resource_id, Permission.access_level)
+        .where(Permission.role_id == role_id)
+    ).all()
     return [{"feature": p.feature, "resource_type": p.resource_type,
              "resource_id": p.resource_id, "access_level": p.access_level} for p in perms]
 
@@ -194,11 +229,13 @@ def get_permissions(role_id: uuid.UUID, session: DBSession, current: CurrentUser
 @router.put("/roles/{role_id}/permissions", status_code=204)
 def set_permissions(role_id: uuid.UUID, perms: List[PermissionSchema],
                     session: DBSession, current: SuperUser):
-    for p in session.exec(select(Permission).where(Permission.role_id == role_id)).all():
-        session.delete(p)
-    for p in perms:
-        session.add(Permission(role_id=role_id, **p.dict()))
+    dumped = [p.model_dump() for p in perms]
+    session.execute(sql_delete(Permission).where(Permission.role_id == role_id))
+    if dumped:
+        session.execute(
+            insert(Permission),
+            [{"id": uuid.uuid4(), "role_id": role_id, **d} for d in dumped],
+        )
     session.commit()
     write_audit(session, "set_permissions", current, "role", str(role_id),
-                request_body={"role_id": str(role_id),
-                              "permissions": [p.dict() for p in perms]})
+                request_body={"role_id": str(role_id), "permissions": dumped})
@@ -2,6 +2,7 @@ import uuid
 from typing import Optional
 
 from fastapi import APIRouter, Query
+from sqlalchemy import func
 from sqlmodel import select
 
 from app.core.deps import CurrentUser, DBSession
@@ -53,9 +54,8 @@ def list_tunnels(
 
 @router.get("/summary")
 def get_vpn_summary(current: CurrentUser, session: DBSession):
-    tunnels = session.exec(select(VpnTunnel)).all()
-    total = len(tunnels)
-    up = sum(1 for t in tunnels if t.status == "up")
-    down = sum(1 for t in tunnels if t.status == "down")
-    unknown = sum(1 for t in tunnels if t.status == "unknown")
-    return {"total": total, "up": up, "down": down, "unknown": unknown}
+    counts = dict(session.exec(
+        select(VpnTunnel.status, func.count()).group_by(VpnTunnel.status)
+    ).all())
+    return {"total": sum(counts.values()), "up": counts.get("up", 0),
+            "down": counts.get("down", 0), "unknown": counts.get("unknown", 0)}
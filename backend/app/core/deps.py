@@ -1,14 +1,17 @@
-import hashlib
 from datetime import datetime, timezone
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import lambda_stmt
 from sqlmodel import Session, select
-from jose import JWTError
+from jwt import InvalidTokenError
 
 from app.db.session import get_session
+from app.models.token import ApiToken
 from app.models.user import User
-from app.core.security import decode_token
+from app.core.security import decode_token, hash_api_token
+from app.services import token_cache, token_touch, user_cache
+from app.services.rbac import RBACService
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -26,47 +29,50 @@ def get_current_user(
     try:
         payload = decode_token(token)
         if payload.get("type") != "access":
-            raise JWTError("Wrong token type")
+            raise InvalidTokenError("Wrong token type")
         user_id: str = payload.get("sub")
-        user = session.get(User, user_id)
+        user = user_cache.load(session, user_id)
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found or inactive",
             )
         return user
-    except JWTError:
+    except InvalidTokenError:
         pass
 
     # Fall back to API token (prefix: ztm_)
     if token.startswith("ztm_"):
-        from app.models.token import ApiToken
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
-        api_token = session.exec(
-            select(ApiToken).where(
-                ApiToken.token_hash == token_hash,
-                ApiToken.revoked == False,
-            )
-        ).first()
-
-        if not api_token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or revoked API token",
-            )
-
-        if api_token.expires_at and api_token.expires_at < datetime.now(timezone.utc):
+        token_hash = hash_api_token(token)
+        cached = token_cache.lookup(token_hash)
+        if cached:
+            token_id, user_id, expires_at = cached
+        else:
+            api_token = session.execute(lambda_stmt(
+                lambda: select(ApiToken).where(
+                    ApiToken.token_hash == token_hash,
+                    ApiToken.revoked == False,
+                )
+            )).scalars().first()
+
+            if not api_token:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or revoked API token",
+                )
+            token_id, user_id, expires_at = api_token.id, api_token.user_id, api_token.expires_at
+            token_cache.store(token_hash, token_id, user_id, expires_at)
+
+        now = datetime.now(timezone.utc)
+        if expires_at and expires_at < now:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="API token expired",
             )
 
-        # Update last_used_at
-        api_token.last_used_at = datetime.now(timezone.utc)
-        session.add(api_token)
-        session.commit()
+        token_touch.touch(token_id, now)
 
-        user = session.get(User, api_token.user_id)
+        user = user_cache.load(session, user_id)
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -89,11 +95,10 @@ def get_rbac(
     session: Annotated[Session, Depends(get_session)],
     current_user: Annotated[User, Depends(get_current_user)],
 ):
-    from app.services.rbac import RBACService
     return RBACService(session=session, user=current_user)
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 SuperUser = Annotated[User, Depends(get_current_active_superuser)]
-RBAC = Annotated["RBACService", Depends(get_rbac)]
+RBAC = Annotated[RBACService, Depends(get_rbac)]
 DBSession = Annotated[Session, Depends(get_session)]
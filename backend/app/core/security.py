@@ -3,27 +3,47 @@ Security utilities: password hashing (argon2), JWT, and Fernet credential encryp
 """
 import base64
 import hashlib
+import os
+import threading
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHashError
 from cryptography.fernet import Fernet
-from jose import jwt
+import jwt
 
 from app.core.config import get_settings
 
-_ph = PasswordHasher()
+
+def _password_hasher() -> PasswordHasher:
+    settings = get_settings()
+    return PasswordHasher(
+        time_cost=settings.argon2_time_cost,
+        memory_cost=settings.argon2_memory_cost,
+        parallelism=settings.argon2_parallelism,
+    )
+
+
+_ph = _password_hasher()
+
+# argon2-cffi releases the GIL while hashing, so request threads already hash
+# in parallel. Past one hash per core that only adds latency, and each hash
+# holds memory_cost KiB, so cap how many run at once in this process.
+_hash_slots = threading.BoundedSemaphore(os.cpu_count() or 4)
 
 
 # ── Password ──────────────────────────────────────────────────────────────────
 
 def hash_password(plain: str) -> str:
-    return _ph.hash(plain)
+    with _hash_slots:
+        return _ph.hash(plain)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     try:
-        return _ph.verify(hashed, plain)
+        with _hash_slots:
+            return _ph.verify(hashed, plain)
     except (VerifyMismatchError, VerificationError, InvalidHashError):
         return False
 
@@ -34,27 +54,46 @@ def password_needs_rehash(hashed: str) -> bool:
 
 # ── JWT ───────────────────────────────────────────────────────────────────────
 
-def create_access_token(subject: str) -> str:
+@lru_cache(maxsize=1)
+def _jwt_config() -> tuple[str, str, list[str], timedelta, timedelta]:
     settings = get_settings()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
-    return jwt.encode({"sub": subject, "exp": expire, "type": "access"},
-                      settings.secret_key, algorithm=settings.algorithm)
+    return (
+        settings.secret_key,
+        settings.algorithm,
+        [settings.algorithm],
+        timedelta(minutes=settings.access_token_expire_minutes),
+        timedelta(days=settings.refresh_token_expire_days),
+    )
+
+
+def create_access_token(subject: str) -> str:
+    key, algorithm, _, access_ttl, _ = _jwt_config()
+    expire = datetime.now(timezone.utc) + access_ttl
+    return jwt.encode({"sub": subject, "exp": expire, "type": "access"}, key, algorithm=algorithm)
 
 
 def create_refresh_token(subject: str) -> str:
-    settings = get_settings()
-    expire = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
-    return jwt.encode({"sub": subject, "exp": expire, "type": "refresh"},
-                      settings.secret_key, algorithm=settings.algorithm)
+    key, algorithm, _, _, refresh_ttl = _jwt_config()
+    expire = datetime.now(timezone.utc) + refresh_ttl
+    return jwt.encode({"sub": subject, "exp": expire, "type": "refresh"}, key, algorithm=algorithm)
 
 
 def decode_token(token: str) -> dict:
-    settings = get_settings()
-    return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    """Verify and decode a JWT; raises jwt.InvalidTokenError if it is invalid or expired."""
+    key, _, algorithms, _, _ = _jwt_config()
+    return jwt.decode(token, key, algorithms=algorithms)
+
+
+# ── API tokens ────────────────────────────────────────────────────────────────
+
+def hash_api_token(raw: str) -> str:
+    """Lookup key stored for an API token (SHA-256 hex; raw tokens are never stored)."""
+    return hashlib.sha256(raw.encode()).hexdigest()
 
 
 # ── Credential encryption ──────────────────────────────────────────────────────
 
+@lru_cache(maxsize=1)
 def _fernet() -> Fernet:
     key = get_settings().encryption_key
     try:
@@ -68,5 +107,11 @@ def encrypt_secret(plain: str) -> str:
     return _fernet().encrypt(plain.encode()).decode()
 
 
+def encrypt_secrets(plains: list[str]) -> list[str]:
+    """Encrypt many values with a single Fernet instance."""
+    f = _fernet()
+    return [f.encrypt(p.encode()).decode() for p in plains]
+
+
 def decrypt_secret(cipher: str) -> str:
     return _fernet().decrypt(cipher.encode()).decode()
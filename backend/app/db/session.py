@@ -10,10 +10,12 @@ def get_engine():
         settings = get_settings()
         _engine = create_engine(
             settings.database_url,
-            echo=(settings.environment == "development"),
+            echo=settings.sqlalchemy_echo,
             pool_pre_ping=True,
-            pool_size=10,
-            max_overflow=20,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
         )
     return _engine
 
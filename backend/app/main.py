@@ -1,7 +1,10 @@
 import logging
 from contextlib import asynccontextmanager
 
+import anyio.to_thread
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import get_settings
@@ -13,8 +16,12 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Zyxel Manager API")
+    anyio.to_thread.current_default_thread_limiter().total_tokens = get_settings().threadpool_size
     yield
     logger.info("Shutting down")
+    from app.services import audit_queue, token_touch
+    token_touch.flush()
+    audit_queue.flush()
 
 
 def create_app() -> FastAPI:
@@ -24,6 +31,7 @@ def create_app() -> FastAPI:
         version="1.0.0",
         description="Central management platform for Zyxel USG FLEX firewalls",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     app.add_middleware(
@@ -32,6 +40,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
     from app.api.v1 import router as v1_router
@@ -8,7 +8,13 @@ import sqlalchemy as sa
 
 class DeviceBackupSettings(SQLModel, table=True):
     __tablename__ = "device_backup_settings"
-    device_id: uuid.UUID = Field(foreign_key="devices.id", primary_key=True)
+    device_id: uuid.UUID = Field(
+        sa_column=Column(
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("devices.id", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
     auto_backup_enabled: bool = Field(default=False)
     interval_hours: int = Field(default=24)
     retention: Optional[int] = Field(default=10)
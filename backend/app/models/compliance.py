@@ -24,8 +24,22 @@ class ComplianceRule(SQLModel, table=True):
 class ComplianceResult(SQLModel, table=True):
     __tablename__ = "compliance_results"
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    rule_id: uuid.UUID = Field(foreign_key="compliance_rules.id", index=True)
-    device_id: uuid.UUID = Field(foreign_key="devices.id", index=True)
+    rule_id: uuid.UUID = Field(
+        sa_column=Column(
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("compliance_rules.id", ondelete="CASCADE"),
+            index=True,
+            nullable=False,
+        )
+    )
+    device_id: uuid.UUID = Field(
+        sa_column=Column(
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("devices.id", ondelete="CASCADE"),
+            index=True,
+            nullable=False,
+        )
+    )
     passed: bool
     actual_value: Optional[str] = Field(default=None, max_length=512)
     checked_at: datetime = Field(
@@ -9,7 +9,14 @@ import sqlalchemy as sa
 class ConfigSnapshot(SQLModel, table=True):
     __tablename__ = "config_snapshots"
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    device_id: uuid.UUID = Field(foreign_key="devices.id", index=True)
+    device_id: uuid.UUID = Field(
+        sa_column=Column(
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("devices.id", ondelete="CASCADE"),
+            index=True,
+            nullable=False,
+        )
+    )
     section: str = Field(default="full", max_length=64)
     data_json: str = Field(default="{}")
     version: int = Field(default=1)
@@ -22,3 +29,21 @@ class ConfigSnapshot(SQLModel, table=True):
         sa_column=Column(sa.DateTime(timezone=True)),
     )
     device: Optional["Device"] = Relationship(back_populates="snapshots")
+
+
+# Serves "latest version for a device" lookups and the snapshot listing as an
+# index-only scan (the listing reads only the included columns).
+sa.Index(
+    "ix_snapshots_device_version",
+    ConfigSnapshot.device_id,
+    ConfigSnapshot.version.desc(),
+    postgresql_include=["id", "checksum", "section", "created_at"],
+)
+
+# Latest snapshot of one section (drift, compliance, reports, interfaces)
+sa.Index(
+    "ix_snapshots_device_section_version",
+    ConfigSnapshot.device_id,
+    ConfigSnapshot.section,
+    ConfigSnapshot.version.desc(),
+)
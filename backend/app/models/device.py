@@ -4,6 +4,7 @@ import uuid
 
 from sqlmodel import SQLModel, Field, Relationship, Column
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
 
 
 class GroupMembership(SQLModel, table=True):
@@ -26,6 +27,9 @@ class DeviceGroup(SQLModel, table=True):
 
 class Device(SQLModel, table=True):
     __tablename__ = "devices"
+    __table_args__ = (
+        sa.Index("ix_devices_tags", "tags", postgresql_using="gin"),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str = Field(index=True, max_length=128)
     model: str = Field(default="USG FLEX 100", max_length=64)
@@ -36,8 +40,11 @@ class Device(SQLModel, table=True):
     adapter: str = Field(default="mock", max_length=32)
     # Encrypted JSON: {"username": "...", "password": "..."}
     encrypted_credentials: Optional[str] = Field(default=None)
-    # JSON array string of tags
-    tags: Optional[str] = Field(default="[]", max_length=1024)
+    # List of tag strings (JSONB on Postgres, GIN-indexed)
+    tags: Optional[List[str]] = Field(
+        default_factory=list,
+        sa_column=Column(sa.JSON().with_variant(JSONB(), "postgresql"), nullable=True),
+    )
     status: str = Field(default="unknown", max_length=16)
     last_seen: Optional[datetime] = Field(
         default=None,
@@ -68,4 +75,7 @@ class Device(SQLModel, table=True):
         sa_column=Column(sa.DateTime(timezone=True), nullable=True),
     )
     groups: List[DeviceGroup] = Relationship(back_populates="devices", link_model=GroupMembership)
-    snapshots: List["ConfigSnapshot"] = Relationship(back_populates="device")
+    # Rows are removed by the devices.id ON DELETE CASCADE, never nulled by the ORM
+    snapshots: List["ConfigSnapshot"] = Relationship(
+        back_populates="device", sa_relationship_kwargs={"passive_deletes": "all"}
+    )
@@ -40,7 +40,13 @@ class BulkJobTarget(SQLModel, table=True):
     __tablename__ = "bulk_job_targets"
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     job_id: uuid.UUID = Field(foreign_key="bulk_jobs.id", index=True)
-    device_id: uuid.UUID = Field(foreign_key="devices.id")
+    device_id: uuid.UUID = Field(
+        sa_column=Column(
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("devices.id", ondelete="CASCADE"),
+            nullable=False,
+        )
+    )
     status: str = Field(default="pending", max_length=16)
     before_json: Optional[str] = Field(default=None)
     after_json: Optional[str] = Field(default=None)
@@ -8,7 +8,14 @@ import sqlalchemy as sa
 class DeviceMetric(SQLModel, table=True):
     __tablename__ = "device_metrics"
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    device_id: uuid.UUID = Field(foreign_key="devices.id", index=True)
+    device_id: uuid.UUID = Field(
+        sa_column=Column(
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("devices.id", ondelete="CASCADE"),
+            index=True,
+            nullable=False,
+        )
+    )
     cpu_pct: Optional[float] = Field(default=None)
     memory_pct: Optional[float] = Field(default=None)
     uptime_seconds: Optional[int] = Field(default=None)
@@ -16,3 +23,12 @@ class DeviceMetric(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(sa.DateTime(timezone=True)),
     )
+
+
+# Per-device time-window reads: WHERE device_id = ? AND collected_at >= ?
+# ORDER BY collected_at DESC
+sa.Index(
+    "ix_device_metrics_device_collected",
+    DeviceMetric.device_id,
+    DeviceMetric.collected_at.desc(),
+)
@@ -21,3 +21,12 @@ class RefreshToken(SQLModel, table=True):
     last_used_at: Optional[datetime] = Field(
         default=None, sa_column=Column(sa.DateTime(timezone=True), nullable=True)
     )
+
+
+# Active sessions of a user, newest first (list_sessions, revoke_all_sessions)
+sa.Index(
+    "ix_refresh_tokens_user_active",
+    RefreshToken.user_id,
+    RefreshToken.created_at.desc(),
+    postgresql_where=sa.text("revoked = false"),
+)
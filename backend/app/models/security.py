@@ -5,6 +5,11 @@ import uuid
 from sqlmodel import SQLModel, Field, Column
 import sqlalchemy as sa
 
+SEVERITY_RANK_SQL = (
+    "CASE severity WHEN 'critical' THEN 0 WHEN 'high' THEN 1 WHEN 'medium' THEN 2 "
+    "WHEN 'low' THEN 3 WHEN 'info' THEN 4 ELSE 5 END"
+)
+
 
 class SecurityScan(SQLModel, table=True):
     __tablename__ = "security_scans"
@@ -60,6 +65,11 @@ class SecurityFinding(SQLModel, table=True):
     category: str = Field(max_length=64)
     # exposed_service | permissive_rule | weak_protocol | missing_hardening | firmware | authentication
     severity: str = Field(max_length=16)  # critical | high | medium | low | info
+    # Sort key derived by the database, most severe first; never set it directly
+    severity_rank: Optional[int] = Field(
+        default=None,
+        sa_column=Column(sa.SmallInteger, sa.Computed(SEVERITY_RANK_SQL, persisted=True)),
+    )
     title: str = Field(max_length=256)
     description: str = Field(max_length=1024)
     recommendation: str = Field(max_length=1024)
@@ -94,6 +104,15 @@ class SecurityFinding(SQLModel, table=True):
     )
 
 
+# Findings listing order and keyset cursor: (severity_rank, title, id)
+sa.Index(
+    "ix_security_findings_rank_title",
+    SecurityFinding.severity_rank,
+    SecurityFinding.title,
+    SecurityFinding.id,
+)
+
+
 class SecurityFindingExclusion(SQLModel, table=True):
     __tablename__ = "security_finding_exclusions"
     __table_args__ = (
@@ -146,3 +165,11 @@ class DeviceRiskScore(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(sa.DateTime(timezone=True)),
     )
+
+
+# Latest score per device: MAX(calculated_at) GROUP BY device_id
+sa.Index(
+    "ix_risk_scores_device_calculated",
+    DeviceRiskScore.device_id,
+    DeviceRiskScore.calculated_at.desc(),
+)
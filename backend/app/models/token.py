@@ -11,7 +11,7 @@ class ApiToken(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="users.id", index=True)
     name: str = Field(max_length=128)
-    token_hash: str = Field(max_length=64)  # SHA256 hex of the raw token
+    token_hash: str = Field(max_length=64, unique=True, index=True)  # SHA256 hex of the raw token
     prefix: str = Field(max_length=8)       # first 8 chars of raw token for display
     expires_at: Optional[datetime] = Field(
         default=None,
@@ -27,3 +27,11 @@ class ApiToken(SQLModel, table=True):
     )
     revoked: bool = Field(default=False)
     ip_allowlist: Optional[str] = Field(default=None, max_length=1024)  # comma-separated CIDRs
+
+
+# A user's tokens, newest first (list_tokens)
+sa.Index(
+    "ix_api_tokens_user_created",
+    ApiToken.user_id,
+    ApiToken.created_at.desc(),
+)
@@ -1,11 +1,15 @@
 import json
 import logging
+import uuid
+from datetime import datetime, timezone
 from typing import Optional
-from sqlmodel import Session
+from sqlalchemy import insert
+from sqlmodel import Session, select
 
 from app.models.audit import AuditLog
 from app.models.audit_config import AuditActionConfig
 from app.models.user import User
+from app.services import audit_queue
 
 logger = logging.getLogger(__name__)
 
@@ -28,34 +32,92 @@ def write_audit(
     response_body: Optional[dict] = None,
 ):
     """
-    Write an audit log entry using its own independent DB session so that
-    a rolled-back or failed caller session never silently swallows the log.
-    All exceptions are caught and logged — audit failures never crash endpoints.
+    Queue an audit log entry for the background writer (services.audit_queue).
+
+    The entry is inserted in a batch by an independent DB session, so a
+    rolled-back or failed caller session never silently swallows the log and
+    the request does not wait on the INSERT. All exceptions are caught and
+    logged — audit failures never crash endpoints.
     """
     try:
-        from app.db.session import get_engine
-        with Session(get_engine()) as audit_session:
-            cfg = audit_session.get(AuditActionConfig, action)
+        audit_queue.enqueue({
+            "action": action,
+            "user_id": user.id if user else None,
+            "username": user.username if user else None,
+            "resource_type": resource_type,
+            "resource_id": str(resource_id) if resource_id else None,
+            "details": details,
+            "ip_address": ip_address,
+            "request_body": request_body,
+            "response_body": response_body,
+            "created_at": datetime.now(timezone.utc),
+        })
+    except Exception:
+        logger.exception("write_audit failed for action=%s", action)
+
+
+def write_audit_batch(events: list[dict]) -> None:
+    """
+    Insert queued audit events, honouring per-action config.
+
+    All rows go in one INSERT; if that fails, each row is retried in its own
+    transaction and only rows that still fail are dropped (and logged).
+    """
+    from app.db.session import get_engine
+    with Session(get_engine()) as audit_session:
+        actions = {e["action"] for e in events}
+        configs = {
+            c.action: c
+            for c in audit_session.exec(
+                select(AuditActionConfig).where(AuditActionConfig.action.in_(actions))
+            )
+        }
+        rows = []
+        for e in events:
+            cfg = configs.get(e["action"])
             if cfg is not None and not cfg.enabled:
-                return
+                continue
 
-            merged: dict = dict(details or {})
+            merged: dict = dict(e["details"] or {})
             if cfg is not None and cfg.log_payload:
-                if request_body:
-                    merged["request"] = _sanitize(request_body)
-                if response_body:
-                    merged["response"] = _sanitize(response_body)
-
-            log = AuditLog(
-                user_id=user.id if user else None,
-                username=user.username if user else None,
-                action=action,
-                resource_type=resource_type,
-                resource_id=str(resource_id) if resource_id else None,
-                details=json.dumps(merged) if merged else None,
-                ip_address=ip_address,
-            )
-            audit_session.add(log)
+                if e["request_body"]:
+                    merged["request"] = _sanitize(e["request_body"])
+                if e["response_body"]:
+                    merged["response"] = _sanitize(e["response_body"])
+            try:
+                details = json.dumps(merged) if merged else None
+            except Exception:
+                logger.exception("write_audit failed for action=%s", e["action"])
+                continue
+
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_id": e["user_id"],
+                "username": e["username"],
+                "action": e["action"],
+                "resource_type": e["resource_type"],
+                "resource_id": e["resource_id"],
+                "details": details,
+                "ip_address": e["ip_address"],
+                "created_at": e["created_at"],
+            })
+        if not rows:
+            return
+        try:
+            audit_session.execute(insert(AuditLog), rows)
             audit_session.commit()
-    except Exception:
-        logger.exception("write_audit failed for action=%s", action)
+            return
+        except Exception:
+            audit_session.rollback()
+            logger.warning("audit batch of %d rows failed, retrying row by row",
+                           len(rows), exc_info=True)
+        # One bad row must not take the rest of the batch down with it
+        for row in rows:
+            try:
+                audit_session.execute(insert(AuditLog), [row])
+                audit_session.commit()
+            except Exception:
+                audit_session.rollback()
+                logger.exception("audit row lost: action=%s user=%s resource=%s/%s",
+                                 row["action"], row["username"],
+                                 row["resource_type"], row["resource_id"])
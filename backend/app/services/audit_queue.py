@@ -0,0 +1,85 @@
+"""
+In-process buffer for audit log writes.
+
+``enqueue()`` hands an event to a daemon thread that drains the queue and
+inserts up to ``_BATCH_SIZE`` rows per transaction, waiting at most
+``_FLUSH_INTERVAL`` seconds for a batch to fill. Routes are sync and run in
+the thread pool, and the same code runs inside Celery workers, so this uses a
+thread and ``queue.Queue`` rather than an asyncio task. When more than
+``_MAX_PENDING`` events are waiting, ``enqueue()`` blocks (back-pressure).
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = 100
+_FLUSH_INTERVAL = 0.05
+_MAX_PENDING = 10_000
+
+_lock = threading.Lock()
+_queue: queue.Queue = queue.Queue(maxsize=_MAX_PENDING)
+_worker: Optional[threading.Thread] = None
+_worker_pid: Optional[int] = None
+
+
+def enqueue(event: dict) -> None:
+    """Queue one audit event for the background writer."""
+    _ensure_worker()
+    _queue.put(event)
+
+
+def flush(timeout: float = 5.0) -> None:
+    """Block until queued events are written or ``timeout`` seconds pass."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _ensure_worker() -> None:
+    global _queue, _worker, _worker_pid
+    pid = os.getpid()
+    if _worker_pid == pid and _worker is not None and _worker.is_alive():
+        return
+    with _lock:
+        if _worker_pid == pid and _worker is not None and _worker.is_alive():
+            return
+        if _worker_pid not in (None, pid):
+            # Forked child (e.g. a Celery worker): the parent's thread and
+            # queue locks did not come along, so start from a fresh queue.
+            _queue = queue.Queue(maxsize=_MAX_PENDING)
+        _worker = threading.Thread(target=_run, name="audit-writer", daemon=True)
+        _worker_pid = pid
+        _worker.start()
+
+
+def _run() -> None:
+    from app.services.audit import write_audit_batch
+
+    q = _queue
+    while True:
+        batch = [q.get()]
+        deadline = time.monotonic() + _FLUSH_INTERVAL
+        while len(batch) < _BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            write_audit_batch(batch)
+        except Exception:
+            logger.exception("audit batch of %d events failed", len(batch))
+        finally:
+            for _ in batch:
+                q.task_done()
+
+
+atexit.register(flush)
@@ -1,10 +1,38 @@
 import json
-from app.core.security import encrypt_secret, decrypt_secret
+import threading
+import time
+
+from app.core.security import encrypt_secret, encrypt_secrets, decrypt_secret
 
 
 def encrypt_credentials(username: str, password: str) -> str:
     return encrypt_secret(json.dumps({"username": username, "password": password}))
 
 
+def encrypt_credentials_many(pairs: list[tuple[str, str]]) -> list[str]:
+    """Batch form of encrypt_credentials for (username, password) pairs."""
+    return encrypt_secrets([json.dumps({"username": u, "password": p}) for u, p in pairs])
+
+
+# Decrypted credentials, keyed on the ciphertext: a credential change always
+# produces a new token, so entries can never be served stale.
+_CACHE_TTL = 30.0
+_CACHE_MAX = 1024
+_cache: dict[str, tuple[float, dict]] = {}
+_cache_lock = threading.Lock()
+
+
 def decrypt_credentials(encrypted: str) -> dict:
-    return json.loads(decrypt_secret(encrypted))
+    now = time.monotonic()
+    hit = _cache.get(encrypted)
+    if hit is not None and hit[0] > now:
+        return dict(hit[1])
+    creds = json.loads(decrypt_secret(encrypted))
+    with _cache_lock:
+        if len(_cache) >= _CACHE_MAX:
+            for key in [k for k, (exp, _) in _cache.items() if exp <= now]:
+                del _cache[key]
+            while len(_cache) >= _CACHE_MAX:
+                del _cache[next(iter(_cache))]
+        _cache[encrypted] = (now + _CACHE_TTL, creds)
+    return dict(creds)
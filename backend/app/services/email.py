@@ -7,6 +7,9 @@ from email.mime.multipart import MIMEMultipart
 
 logger = logging.getLogger(__name__)
 
+# Built once: creating a default context loads the system trust store.
+_TLS_CONTEXT = ssl.create_default_context()
+
 
 def send_email(to: str, subject: str, body: str, html_body: str | None = None) -> None:
     from app.core.config import get_settings
@@ -25,18 +28,16 @@ def send_email(to: str, subject: str, body: str, html_body: str | None = None) -
     if html_body:
         msg.attach(MIMEText(html_body, "html"))
 
-    context = ssl.create_default_context()
-
     try:
         if settings.smtp_use_tls:
-            with smtplib.SMTP_SSL(settings.smtp_host, settings.smtp_port, context=context) as server:
+            with smtplib.SMTP_SSL(settings.smtp_host, settings.smtp_port, context=_TLS_CONTEXT) as server:
                 if settings.smtp_user and settings.smtp_password:
                     server.login(settings.smtp_user, settings.smtp_password)
                 server.sendmail(settings.smtp_from, to, msg.as_string())
         else:
             with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
                 if settings.smtp_use_starttls:
-                    server.starttls(context=context)
+                    server.starttls(context=_TLS_CONTEXT)
                 if settings.smtp_user and settings.smtp_password:
                     server.login(settings.smtp_user, settings.smtp_password)
                 server.sendmail(settings.smtp_from, to, msg.as_string())
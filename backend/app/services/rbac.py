@@ -7,22 +7,30 @@ Permission scoping: feature + resource_type + resource_id + access_level.
 from typing import Optional
 from sqlmodel import Session, select
 
-from app.models.user import User, UserRole, Role, Permission
+from app.models.user import User, UserRole, Permission
 
 
 class RBACService:
     def __init__(self, session: Session, user: User):
         self.session = session
         self.user = user
+        self._permissions = None
 
-    def _get_permissions(self) -> list[Permission]:
-        stmt = (
-            select(Permission)
-            .join(Role, Permission.role_id == Role.id)
-            .join(UserRole, UserRole.role_id == Role.id)
-            .where(UserRole.user_id == self.user.id)
-        )
-        return self.session.exec(stmt).all()
+    def _get_permissions(self) -> list:
+        """The user's permission rows, loaded once per request (one SELECT ... JOIN)."""
+        if self._permissions is None:
+            stmt = (
+                select(
+                    Permission.feature,
+                    Permission.access_level,
+                    Permission.resource_type,
+                    Permission.resource_id,
+                )
+                .join(UserRole, UserRole.role_id == Permission.role_id)
+                .where(UserRole.user_id == self.user.id)
+            )
+            self._permissions = self.session.exec(stmt).all()
+        return self._permissions
 
     def can(
         self,
@@ -0,0 +1,18 @@
+"""Shared Redis client for the request-path caches (token_cache, user_cache)."""
+from functools import lru_cache
+
+import redis as redis_lib
+
+from app.core.config import get_settings
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis_lib.Redis:
+    # Short timeouts: a slow Redis must not stall authentication, callers fall
+    # back to the database on RedisError.
+    return redis_lib.from_url(
+        get_settings().redis_url,
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
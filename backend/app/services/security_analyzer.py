@@ -4,6 +4,7 @@ Rule-based security analyzer for Zyxel USG FLEX config snapshots.
 Each check_* function receives the full config dict and returns either a
 FindingDict or None.  All checks are collected in ALL_CHECKS at module load.
 """
+from bisect import bisect_right
 from typing import Optional, TypedDict
 
 
@@ -1434,30 +1435,23 @@ def analyze_config(config: dict) -> list[FindingDict]:
 # Score calculation
 # ---------------------------------------------------------------------------
 
+# Lower bound of each grade's score range, ascending; anything below is "F"
+_GRADE_CUTOFFS = (25, 50, 75, 90)
+_GRADES = "FDCBA"
+_SEVERITY_WEIGHTS = {"critical": 25, "high": 10, "medium": 5, "low": 2, "info": 1}
+
+
+def score_grade(score: float) -> str:
+    """Letter grade (A-F) for a 0-100 risk score."""
+    return _GRADES[bisect_right(_GRADE_CUTOFFS, score)]
+
+
 def calculate_score(findings: list) -> tuple[int, str]:
     """
     Returns (score, grade).
     score: 0-100 (100 = no findings)
     grade: A/B/C/D/F
     """
-    critical = sum(1 for f in findings if f.get("severity") == "critical")
-    high = sum(1 for f in findings if f.get("severity") == "high")
-    medium = sum(1 for f in findings if f.get("severity") == "medium")
-    low = sum(1 for f in findings if f.get("severity") == "low")
-    info = sum(1 for f in findings if f.get("severity") == "info")
-
-    score = 100 - (critical * 25 + high * 10 + medium * 5 + low * 2 + info * 1)
-    score = max(0, score)
-
-    if score >= 90:
-        grade = "A"
-    elif score >= 75:
-        grade = "B"
-    elif score >= 50:
-        grade = "C"
-    elif score >= 25:
-        grade = "D"
-    else:
-        grade = "F"
-
-    return score, grade
+    penalty = sum(_SEVERITY_WEIGHTS.get(f.get("severity"), 0) for f in findings)
+    score = max(0, 100 - penalty)
+    return score, score_grade(score)
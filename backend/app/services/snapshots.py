@@ -0,0 +1,96 @@
+"""Helpers for reading and writing ConfigSnapshot payloads."""
+import hashlib
+from typing import Optional
+
+import orjson
+from sqlalchemy import func
+from sqlmodel import select
+
+from app.models.config import ConfigSnapshot
+
+_CACHE_KEY = "snapshot_data"
+
+
+def encode_config(config: dict) -> tuple[str, str]:
+    """Serialise a config dict for storage. Returns (data_json, sha256 checksum)."""
+    data = orjson.dumps(config, option=orjson.OPT_NON_STR_KEYS)
+    return data.decode(), hashlib.sha256(data).hexdigest()
+
+
+def snapshot_data(session, snap: ConfigSnapshot) -> dict:
+    """
+    Return the parsed config of a snapshot, memoised on the session.
+
+    Snapshots are immutable, so the decoded dict is cached in ``session.info``
+    keyed by snapshot id and reused for the rest of the request. Callers must
+    treat the returned dict as read-only.
+    """
+    if session is None:
+        return orjson.loads(snap.data_json)
+    cache = session.info.setdefault(_CACHE_KEY, {})
+    data = cache.get(snap.id)
+    if data is None:
+        data = cache[snap.id] = orjson.loads(snap.data_json)
+    return data
+
+
+def store_snapshot(
+    session,
+    device_id,
+    config: dict,
+    triggered_by: str,
+    label: Optional[str] = None,
+) -> ConfigSnapshot:
+    """Add a new full-config snapshot for a device at the next version (not committed)."""
+    data_str, checksum = encode_config(config)
+    # Evaluated by the database as part of the INSERT; the attribute is
+    # loaded back on first access.
+    version = (
+        select(func.coalesce(func.max(ConfigSnapshot.version), 0) + 1)
+        .where(ConfigSnapshot.device_id == device_id)
+        .scalar_subquery()
+    )
+    snapshot = ConfigSnapshot(
+        device_id=device_id,
+        data_json=data_str,
+        checksum=checksum,
+        version=version,
+        triggered_by=triggered_by,
+        label=label,
+    )
+    session.add(snapshot)
+    return snapshot
+
+
+def latest_snapshots(session, device_ids, sections) -> dict[tuple, ConfigSnapshot]:
+    """
+    Latest snapshot of each requested section for each device, in one query.
+
+    Returns a dict keyed by (device_id, section); pairs with no snapshot are
+    absent.
+    """
+    device_ids = list(device_ids)
+    if not device_ids or not sections:
+        return {}
+    latest = (
+        select(
+            ConfigSnapshot.device_id,
+            ConfigSnapshot.section,
+            func.max(ConfigSnapshot.version).label("version"),
+        )
+        .where(
+            ConfigSnapshot.device_id.in_(device_ids),
+            ConfigSnapshot.section.in_(sections),
+        )
+        .group_by(ConfigSnapshot.device_id, ConfigSnapshot.section)
+        .subquery()
+    )
+    snaps = session.exec(
+        select(ConfigSnapshot).join(
+            latest,
+            (ConfigSnapshot.device_id == latest.c.device_id)
+            & (ConfigSnapshot.section == latest.c.section)
+            & (ConfigSnapshot.version == latest.c.version),
+        )
+    ).all()
+    return {(snap.device_id, snap.section): snap for snap in snaps}
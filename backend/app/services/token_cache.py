@@ -0,0 +1,51 @@
+"""
+Redis cache in front of API token lookups.
+
+``get_current_user`` resolves ``ztm_`` tokens through ``lookup()`` first; a hit
+skips the ApiToken SELECT. Entries live for ``_TTL`` seconds and are dropped
+by ``invalidate()`` when a token is revoked.
+
+Redis is an optimisation only: every helper swallows ``RedisError`` and the
+caller falls back to the database.
+"""
+import logging
+import uuid
+from datetime import datetime
+from typing import Optional
+
+import redis as redis_lib
+
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_TTL = 60
+_KEY = "ztm:apitoken:{}"
+
+
+def lookup(token_hash: str) -> Optional[tuple[uuid.UUID, uuid.UUID, Optional[datetime]]]:
+    """Cached (token_id, user_id, expires_at) for a token hash, or None."""
+    try:
+        raw = get_redis().get(_KEY.format(token_hash))
+    except redis_lib.RedisError:
+        logger.warning("api token cache unavailable", exc_info=True)
+        return None
+    if not raw:
+        return None
+    token_id, user_id, expires = raw.split("|")
+    return uuid.UUID(token_id), uuid.UUID(user_id), datetime.fromisoformat(expires) if expires else None
+
+
+def store(token_hash: str, token_id, user_id, expires_at: Optional[datetime]) -> None:
+    value = f"{token_id}|{user_id}|{expires_at.isoformat() if expires_at else ''}"
+    try:
+        get_redis().setex(_KEY.format(token_hash), _TTL, value)
+    except redis_lib.RedisError:
+        logger.warning("api token cache unavailable", exc_info=True)
+
+
+def invalidate(token_hash: str) -> None:
+    try:
+        get_redis().delete(_KEY.format(token_hash))
+    except redis_lib.RedisError:
+        logger.warning("api token cache unavailable", exc_info=True)
@@ -0,0 +1,81 @@
+"""
+Deferred ``last_used_at`` writes for API tokens.
+
+``touch()`` records the latest use of a token in memory; a daemon thread
+writes everything recorded in the last ``_FLUSH_INTERVAL`` seconds with a
+single UPDATE. Token authentication therefore does no writes itself, and a
+token used a thousand times between flushes costs one row update. Uses a
+thread for the same reasons as ``audit_queue``.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_FLUSH_INTERVAL = 5.0
+
+_lock = threading.Lock()
+_pending: dict = {}
+_worker: Optional[threading.Thread] = None
+_worker_pid: Optional[int] = None
+
+
+def touch(token_id, used_at: datetime) -> None:
+    """Record that ``token_id`` was used at ``used_at``."""
+    _ensure_worker()
+    with _lock:
+        _pending[token_id] = used_at
+
+
+def flush() -> None:
+    """Write all pending touches now."""
+    global _pending
+    with _lock:
+        batch, _pending = _pending, {}
+    if not batch:
+        return
+    from sqlalchemy import case, update
+    from sqlmodel import Session
+    from app.db.session import get_engine
+    from app.models.token import ApiToken
+
+    with Session(get_engine()) as session:
+        session.execute(
+            update(ApiToken)
+            .where(ApiToken.id.in_(batch))
+            .values(last_used_at=case(batch, value=ApiToken.id))
+        )
+        session.commit()
+
+
+def _ensure_worker() -> None:
+    global _pending, _worker, _worker_pid
+    pid = os.getpid()
+    if _worker_pid == pid and _worker is not None and _worker.is_alive():
+        return
+    with _lock:
+        if _worker_pid == pid and _worker is not None and _worker.is_alive():
+            return
+        if _worker_pid not in (None, pid):
+            # Forked child: the parent's pending touches are the parent's to write.
+            _pending = {}
+        _worker = threading.Thread(target=_run, name="token-touch", daemon=True)
+        _worker_pid = pid
+        _worker.start()
+
+
+def _run() -> None:
+    while True:
+        time.sleep(_FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception:
+            logger.exception("api token last_used_at flush failed")
+
+
+atexit.register(flush)
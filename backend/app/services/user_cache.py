@@ -0,0 +1,84 @@
+"""
+Redis cache of authenticated users, shared by all API workers.
+
+``get_current_user`` reads users through ``load()``: a hit builds a User and
+attaches it to the request's session without a SELECT. Every write to a User
+row must call ``invalidate()`` after committing; since the cache lives in
+Redis, that takes effect on every worker at once. Entries also expire after
+``_TTL`` seconds.
+
+Each user has a version counter that ``invalidate()`` increments. A miss
+records the version before reading the row and stores it with the entry; an
+entry whose version no longer matches is ignored. A read that raced with an
+update therefore cannot put the old row back in the cache.
+
+The password hash and TOTP secret are never cached; on a cached User they are
+expired and load from the database on first access.
+
+Redis is an optimisation only: any ``RedisError`` falls back to the database.
+"""
+import logging
+import uuid
+from datetime import datetime
+from typing import Optional
+
+import orjson
+import redis as redis_lib
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session
+
+from app.models.user import User
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_TTL = 30
+_KEY = "ztm:user:{}"
+_VERSION_KEY = "ztm:user:{}:version"
+# Must outlive any entry written under the previous version
+_VERSION_TTL = 86400
+_UNCACHED = ("hashed_password", "totp_secret")
+
+
+def load(session: Session, user_id) -> Optional[User]:
+    """The user with ``user_id``, from the cache if possible; None if missing."""
+    key = _KEY.format(user_id)
+    try:
+        raw, version = get_redis().mget(key, _VERSION_KEY.format(user_id))
+    except redis_lib.RedisError:
+        logger.warning("user cache unavailable", exc_info=True)
+        return session.get(User, user_id)
+    if raw:
+        cached = orjson.loads(raw)
+        if cached["version"] == version:
+            data = cached["user"]
+            data["id"] = uuid.UUID(data["id"])
+            for field in ("created_at", "updated_at"):
+                if data[field]:
+                    data[field] = datetime.fromisoformat(data[field])
+            user = User(**data)
+            make_transient_to_detached(user)
+            session.add(user)
+            session.expire(user, _UNCACHED)
+            return user
+
+    user = session.get(User, user_id)
+    if user is not None and user.is_active:
+        value = {"version": version, "user": user.model_dump(exclude=set(_UNCACHED))}
+        try:
+            get_redis().setex(key, _TTL, orjson.dumps(value))
+        except redis_lib.RedisError:
+            logger.warning("user cache unavailable", exc_info=True)
+    return user
+
+
+def invalidate(user_id) -> None:
+    version_key = _VERSION_KEY.format(user_id)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.incr(version_key)
+        pipe.expire(version_key, _VERSION_TTL)
+        pipe.delete(_KEY.format(user_id))
+        pipe.execute()
+    except redis_lib.RedisError:
+        logger.warning("user cache unavailable", exc_info=True)
@@ -1,10 +1,10 @@
 """
-Celery tasks: manual/scheduled device config backups.
+Celery tasks: manual/scheduled device config backups and restores.
 """
-import json
-import hashlib
 import logging
+import uuid
 from datetime import datetime, timezone
+from typing import Optional
 
 from app.tasks.celery_app import celery_app
 from app.db.session import get_engine
@@ -13,45 +13,40 @@ from sqlmodel import Session, select
 from app.models.device import Device
 from app.models.config import ConfigSnapshot
 from app.models.backup import DeviceBackupSettings
+from app.models.user import User
 from app.adapters.registry import get_adapter
+from app.services.audit import write_audit
 from app.services.crypto import decrypt_credentials
+from app.services.snapshots import snapshot_data, store_snapshot
 
 logger = logging.getLogger(__name__)
 
 
 @celery_app.task(bind=True, name="backup.backup_device")
-def backup_device(self, device_id: str, triggered_by: str = "manual"):
+def backup_device(self, device_id: str, triggered_by: str = "manual", user_id: Optional[str] = None):
     engine = get_engine()
     with Session(engine) as session:
-        import uuid as _uuid
-        device = session.get(Device, _uuid.UUID(device_id))
+        device = session.get(Device, uuid.UUID(device_id))
         if not device:
             logger.error("backup_device: device %s not found", device_id)
             return {"error": "Device not found"}
+        user = session.get(User, uuid.UUID(user_id)) if user_id else None
 
         creds = decrypt_credentials(device.encrypted_credentials) if device.encrypted_credentials else {}
-        config = get_adapter(device.adapter).fetch_config(device, creds, section="full")
-        data_str = json.dumps(config)
-        checksum = hashlib.sha256(data_str.encode()).hexdigest()
-
-        latest = session.exec(
-            select(ConfigSnapshot)
-            .where(ConfigSnapshot.device_id == device.id)
-            .order_by(ConfigSnapshot.version.desc())
-        ).first()
-        version = (latest.version + 1) if latest else 1
-
-        snapshot = ConfigSnapshot(
-            device_id=device.id,
-            data_json=data_str,
-            checksum=checksum,
-            version=version,
-            triggered_by=triggered_by,
-        )
-        session.add(snapshot)
+        try:
+            config = get_adapter(device.adapter).fetch_config(device, creds, section="full")
+        except Exception as exc:
+            if user:
+                write_audit(None, "trigger_backup_failed", user, "device", device_id,
+                            response_body={"error": str(exc), "phase": "fetch_config"})
+            raise
+
+        snapshot = store_snapshot(session, device.id, config, triggered_by=triggered_by)
         session.flush()
         snapshot_id = str(snapshot.id)
         snapshot_created_at = snapshot.created_at
+        version = snapshot.version
+        checksum = snapshot.checksum
 
         # Enforce retention
         settings = session.get(DeviceBackupSettings, device.id)
@@ -73,8 +68,13 @@ def backup_device(self, device_id: str, triggered_by: str = "manual"):
         session.add(settings)
         session.commit()
 
+        if user:
+            write_audit(None, "trigger_backup", user, "device", device_id,
+                        response_body={"snapshot_id": snapshot_id, "version": version,
+                                       "checksum": checksum})
         return {
             "id": snapshot_id,
+            "device_id": device_id,
             "version": version,
             "checksum": checksum,
             "triggered_by": triggered_by,
@@ -82,6 +82,96 @@ def backup_device(self, device_id: str, triggered_by: str = "manual"):
         }
 
 
+def _restore(session: Session, device: Device, config: dict, user: Optional[User],
+             action: str, audit_ctx: dict) -> tuple[str, dict]:
+    """Take a pre-restore backup, push config to the device. Returns (pre_snap_id, result)."""
+    creds = decrypt_credentials(device.encrypted_credentials) if device.encrypted_credentials else {}
+    adapter = get_adapter(device.adapter)
+
+    # Pre-restore safety backup
+    try:
+        current_config = adapter.fetch_config(device, creds, section="full")
+        pre_snap = store_snapshot(session, device.id, current_config, triggered_by="pre_restore")
+        session.commit()
+        session.refresh(pre_snap)
+    except Exception as exc:
+        session.rollback()
+        write_audit(None, f"{action}_failed", user, "device", str(device.id),
+                    response_body={"error": str(exc), "phase": "pre_restore_backup", **audit_ctx})
+        raise RuntimeError(f"Failed to create pre-restore backup: {exc}") from exc
+
+    try:
+        result = adapter.restore_config(device, creds, config)
+    except Exception as exc:
+        write_audit(None, f"{action}_failed", user, "device", str(device.id),
+                    response_body={"error": str(exc), **audit_ctx})
+        raise
+
+    if not result.get("success"):
+        write_audit(None, f"{action}_failed", user, "device", str(device.id),
+                    response_body={"message": result.get("message"), **audit_ctx})
+        raise RuntimeError(result.get("message", "Restore failed"))
+    return str(pre_snap.id), result
+
+
+@celery_app.task(bind=True, name="backup.restore_snapshot")
+def restore_snapshot(self, snapshot_id: str, device_id: str, user_id: Optional[str] = None):
+    engine = get_engine()
+    with Session(engine) as session:
+        snap = session.get(ConfigSnapshot, uuid.UUID(snapshot_id))
+        device = session.get(Device, uuid.UUID(device_id))
+        if not snap or not device:
+            raise LookupError("Snapshot or target device not found")
+        user = session.get(User, uuid.UUID(user_id)) if user_id else None
+
+        pre_snap_id, result = _restore(session, device, snapshot_data(session, snap), user,
+                                       "restore_backup", {"snapshot_id": snapshot_id})
+
+        write_audit(None, "restore_backup", user, "device", device_id,
+                    request_body={"snapshot_id": snapshot_id, "version": snap.version,
+                                  "device_name": device.name},
+                    response_body={"pre_restore_snapshot_id": pre_snap_id})
+        return {
+            "success": True,
+            "message": result.get("message", "Configuration restored successfully"),
+            "pre_restore_snapshot_id": pre_snap_id,
+        }
+
+
+@celery_app.task(bind=True, name="backup.upload_restore")
+def upload_restore(self, device_id: str, config: dict, label: Optional[str] = None,
+                   user_id: Optional[str] = None):
+    engine = get_engine()
+    with Session(engine) as session:
+        device = session.get(Device, uuid.UUID(device_id))
+        if not device:
+            raise LookupError("Device not found")
+        user = session.get(User, uuid.UUID(user_id)) if user_id else None
+
+        pre_snap_id, result = _restore(session, device, config, user, "upload_restore", {})
+        message = result.get("message", "Configuration restored successfully")
+
+        # Store uploaded config as a new snapshot
+        try:
+            snap = store_snapshot(session, device.id, config, triggered_by="upload", label=label)
+            session.commit()
+            session.refresh(snap)
+        except Exception as exc:
+            session.rollback()
+            write_audit(None, "upload_restore", user, "device", device_id,
+                        response_body={"warning": f"Restore succeeded but snapshot save failed: {exc}",
+                                       "pre_restore_snapshot_id": pre_snap_id})
+            return {"success": True, "message": message, "snapshot_id": None,
+                    "pre_restore_snapshot_id": pre_snap_id}
+
+        write_audit(None, "upload_restore", user, "device", device_id,
+                    request_body={"label": label},
+                    response_body={"snapshot_id": str(snap.id), "version": snap.version,
+                                   "pre_restore_snapshot_id": pre_snap_id})
+        return {"success": True, "message": message, "snapshot_id": str(snap.id),
+                "pre_restore_snapshot_id": pre_snap_id}
+
+
 @celery_app.task(name="backup.scheduled_backup_check")
 def scheduled_backup_check():
     engine = get_engine()
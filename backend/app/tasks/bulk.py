@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 
 from app.tasks.celery_app import celery_app
 from app.db.session import get_engine
+from sqlalchemy import func
 from sqlmodel import Session, select
 
 from app.models.job import BulkJob, BulkJobTarget, BulkJobLog
@@ -75,13 +76,12 @@ def run_bulk_job(self, job_id: str):
 
                     data_str = json.dumps(after)
                     checksum = hashlib.sha256(data_str.encode()).hexdigest()
-                    latest = session.exec(
-                        select(ConfigSnapshot)
+                    max_version = session.exec(
+                        select(func.max(ConfigSnapshot.version))
                         .where(ConfigSnapshot.device_id == device.id,
                                ConfigSnapshot.section == job.section)
-                        .order_by(ConfigSnapshot.version.desc())
-                    ).first()
-                    version = (latest.version + 1) if latest else 1
+                    ).one()
+                    version = (max_version or 0) + 1
                     session.add(ConfigSnapshot(
                         device_id=device.id, section=job.section,
                         data_json=data_str, checksum=checksum, version=version,
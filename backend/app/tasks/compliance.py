@@ -69,6 +69,7 @@ def _check_rule_device(session: Session, rule: ComplianceRule, device: Device):
         .where(ConfigSnapshot.device_id == device.id,
                ConfigSnapshot.section == rule.section)
         .order_by(ConfigSnapshot.version.desc())
+        .limit(1)
     ).first()
 
     if not snapshot:
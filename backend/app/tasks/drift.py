@@ -11,6 +11,7 @@ from app.tasks.celery_app import celery_app
 from app.db.session import get_engine
 from app.models.device import Device
 from app.models.config import ConfigSnapshot
+from app.services.snapshots import snapshot_data
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,7 @@ def _check_device_drift(session: Session, device: Device):
                ConfigSnapshot.is_baseline == True,
                ConfigSnapshot.section == "full")
         .order_by(ConfigSnapshot.version.desc())
+        .limit(1)
     ).first()
 
     if not baseline:
@@ -44,12 +46,16 @@ def _check_device_drift(session: Session, device: Device):
         .where(ConfigSnapshot.device_id == device.id,
                ConfigSnapshot.section == "full")
         .order_by(ConfigSnapshot.version.desc())
+        .limit(1)
     ).first()
 
     if not latest or latest.id == baseline.id:
         return
 
-    drift = latest.checksum != baseline.checksum
+    # Checksums are over the serialised text, so snapshots written by a
+    # different encoder can differ without any config change — confirm on content.
+    drift = (latest.checksum != baseline.checksum
+             and snapshot_data(session, latest) != snapshot_data(session, baseline))
     if drift and not device.drift_detected:
         device.drift_detected = True
         device.drift_detected_at = datetime.now(timezone.utc)
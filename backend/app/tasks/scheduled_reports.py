@@ -19,7 +19,7 @@ from app.tasks.celery_app import celery_app
 from app.db.session import get_engine
 from app.models.scheduled_report import ScheduledReport
 from app.models.device import Device, GroupMembership
-from app.models.config import ConfigSnapshot
+from app.services.snapshots import latest_snapshots
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -67,48 +67,48 @@ def _run_report(session: Session, report: ScheduledReport, update_next_run: bool
         device_ids.add(uuid.UUID(did))
 
     saved_group_ids = json.loads(report.group_ids or "[]")
-    for gid in saved_group_ids:
-        for m in session.exec(
-            select(GroupMembership).where(GroupMembership.group_id == uuid.UUID(gid))
-        ).all():
-            device_ids.add(m.device_id)
-
-    if not device_ids:
-        device_ids = {d.id for d in session.exec(select(Device).where(Device.deleted_at == None)).all()}  # noqa: E711
+    if saved_group_ids:
+        device_ids.update(session.exec(
+            select(GroupMembership.device_id)
+            .where(GroupMembership.group_id.in_([uuid.UUID(gid) for gid in saved_group_ids]))
+        ).all())
 
     tags = json.loads(report.tags or "[]")
     sections = json.loads(report.sections or "[]") or SECTIONS
 
+    device_q = select(Device).where(Device.deleted_at == None)  # noqa: E711
+    if device_ids:
+        device_q = device_q.where(Device.id.in_(device_ids))
+    devices = session.exec(device_q).all()
+    if tags:
+        devices = [d for d in devices if any(t in (d.tags or []) for t in tags)]
+    snap_map = latest_snapshots(session, (d.id for d in devices), sections)
+
     rows = []
-    for did in device_ids:
-        device = session.get(Device, did)
-        if not device or device.deleted_at:
-            continue
-        if tags:
-            dev_tags = json.loads(device.tags or "[]")
-            if not any(t in dev_tags for t in tags):
-                continue
+    for device in devices:
         row = {
             "device_id": str(device.id), "device_name": device.name,
             "model": device.model, "mgmt_ip": device.mgmt_ip,
             "status": device.status, "firmware_version": device.firmware_version,
         }
         for section in sections:
-            snap = session.exec(
-                select(ConfigSnapshot)
-                .where(ConfigSnapshot.device_id == did, ConfigSnapshot.section == section)
-                .order_by(ConfigSnapshot.version.desc())
-            ).first()
+            snap = snap_map.get((device.id, section))
             row[f"config_{section}"] = json.loads(snap.data_json) if snap else None
         rows.append(row)
 
     if report.format == "csv":
         buf = io.StringIO()
         if rows:
-            flat = [{k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in r.items()} for r in rows]
-            writer = csv.DictWriter(buf, fieldnames=flat[0].keys())
-            writer.writeheader()
-            writer.writerows(flat)
+            header = list(rows[0])
+            # Only the config_* columns hold parsed JSON; the rest are scalars
+            json_cols = [k.startswith("config_") for k in header]
+            writer = csv.writer(buf)
+            writer.writerow(header)
+            writer.writerows(
+                [json.dumps(v) if is_json and v is not None else v
+                 for is_json, v in zip(json_cols, r.values())]
+                for r in rows
+            )
         content = buf.getvalue().encode()
         filename = f"report_{report.name}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.csv"
         mime_type = "text/csv"
@@ -0,0 +1,53 @@
+"""
+Find Argon2 parameters that hash a password in about a target time on this host.
+
+Keeps time_cost and parallelism fixed and binary-searches memory_cost (KiB),
+then prints the ARGON2_* values to put in .env.
+Run manually: python -m scripts.calibrate_argon2 [target_ms]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from argon2 import PasswordHasher
+
+from app.core.config import get_settings
+
+_SAMPLES = 5
+
+
+def _hash_ms(memory_cost: int, time_cost: int, parallelism: int) -> float:
+    ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    timings = []
+    for _ in range(_SAMPLES):
+        start = time.perf_counter()
+        ph.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[_SAMPLES // 2]
+
+
+def calibrate(target_ms: float) -> int:
+    settings = get_settings()
+    t, p = settings.argon2_time_cost, settings.argon2_parallelism
+    lo, hi = 8 * p, 1024 * 1024  # argon2 minimum .. 1 GiB
+    while hi - lo > 1024:
+        mid = (lo + hi) // 2
+        ms = _hash_ms(mid, t, p)
+        print(f"memory_cost={mid:>8} KiB  {ms:7.1f} ms")
+        if ms < target_ms:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+if __name__ == "__main__":
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 250.0
+    memory_cost = calibrate(target)
+    settings = get_settings()
+    print()
+    print(f"ARGON2_TIME_COST={settings.argon2_time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={settings.argon2_parallelism}")
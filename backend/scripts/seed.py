@@ -77,7 +77,7 @@ def seed():
                     name=name, model=model, mgmt_ip=ip, port=443,
                     protocol="https", adapter="mock",
                     encrypted_credentials=encrypt_credentials("admin", "demo_password"),
-                    tags=json.dumps(tags),
+                    tags=tags,
                 )
                 s.add(device)
                 s.commit()
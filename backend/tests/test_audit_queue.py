@@ -0,0 +1,95 @@
+"""Tests for the batched audit writer (services.audit + services.audit_queue)."""
+import json
+import uuid
+from datetime import datetime, timezone
+import pytest
+from unittest.mock import patch
+from sqlmodel import select
+
+from app.models.audit import AuditLog
+from app.models.audit_config import AuditActionConfig
+from app.models.user import User
+from app.core.security import hash_password
+from app.services import audit_queue
+from app.services.audit import write_audit, write_audit_batch
+
+
+@pytest.fixture(autouse=True)
+def _audit_engine(engine):
+    # write_audit_batch opens its own session on get_engine()
+    with patch("app.db.session.get_engine", return_value=engine):
+        yield
+
+
+def _make_user(session):
+    u = User(email=f"{uuid.uuid4()}@t.com", username=f"u-{uuid.uuid4().hex[:8]}",
+             hashed_password=hash_password("pw"))
+    session.add(u)
+    session.commit()
+    session.refresh(u)
+    return u
+
+
+def _logs(session, action=None):
+    stmt = select(AuditLog)
+    if action:
+        stmt = stmt.where(AuditLog.action == action)
+    return session.exec(stmt).all()
+
+
+def test_enqueued_events_are_written_on_flush(session):
+    user = _make_user(session)
+    for i in range(3):
+        write_audit(session, "update_device", user, "device", f"dev-{i}", {"n": i})
+    audit_queue.flush()
+
+    logs = _logs(session, "update_device")
+    assert sorted(l.resource_id for l in logs) == ["dev-0", "dev-1", "dev-2"]
+    assert all(l.user_id == user.id and l.username == user.username for l in logs)
+    assert {json.loads(l.details)["n"] for l in logs} == {0, 1, 2}
+
+
+def test_disabled_action_is_not_written(session):
+    session.add(AuditActionConfig(action="test_connection", enabled=False))
+    session.commit()
+
+    write_audit(session, "test_connection", None, "device", "d1")
+    write_audit(session, "sync_device", None, "device", "d1")
+    audit_queue.flush()
+
+    assert _logs(session, "test_connection") == []
+    assert len(_logs(session, "sync_device")) == 1
+
+
+def test_log_payload_adds_sanitized_bodies(session):
+    session.add(AuditActionConfig(action="create_user", enabled=True, log_payload=True))
+    session.commit()
+
+    write_audit(session, "create_user", None, "user", "u1",
+                request_body={"username": "bob", "password": "hunter2"})
+    audit_queue.flush()
+
+    [log] = _logs(session, "create_user")
+    assert json.loads(log.details)["request"] == {"username": "bob", "password": "***"}
+
+
+def test_failed_batch_is_retried_row_by_row(session):
+    def event(resource_id):
+        return {"action": "delete_device", "user_id": None, "username": None,
+                "resource_type": "device", "resource_id": resource_id, "details": None,
+                "ip_address": None, "request_body": None, "response_body": None,
+                "created_at": datetime.now(timezone.utc)}
+
+    events = [event("ok-1"), event("bad"), event("ok-2")]
+    real_execute = type(session).execute
+
+    def execute(self, stmt, params=None, *args, **kwargs):
+        # Fail the bulk insert and the single-row insert of the "bad" event
+        if isinstance(params, list) and any(p["resource_id"] == "bad" for p in params):
+            raise RuntimeError("insert failed")
+        return real_execute(self, stmt, params, *args, **kwargs)
+
+    with patch.object(type(session), "execute", execute):
+        write_audit_batch(events)
+
+    assert sorted(l.resource_id for l in _logs(session, "delete_device")) == ["ok-1", "ok-2"]
@@ -24,7 +24,7 @@ def _make_user(session):
 
 def _make_device(session):
     d = Device(name=f"dev-{uuid.uuid4().hex[:6]}", model="USG FLEX 100", mgmt_ip="10.0.0.1",
-               adapter="mock", encrypted_credentials=encrypt_credentials("admin", "pw"), tags="[]")
+               adapter="mock", encrypted_credentials=encrypt_credentials("admin", "pw"), tags=[])
     session.add(d)
     session.commit()
     session.refresh(d)
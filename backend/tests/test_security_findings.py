@@ -0,0 +1,82 @@
+"""Tests for keyset pagination of GET /security/findings."""
+import uuid
+import pytest
+from sqlmodel import select
+
+from app.core.deps import get_current_user
+from app.core.security import hash_password
+from app.main import app
+from app.models.device import Device
+from app.models.security import SecurityFinding
+from app.models.user import User
+from app.services.crypto import encrypt_credentials
+
+URL = "/api/v1/security/findings"
+
+
+@pytest.fixture(name="findings")
+def findings_fixture(session, client):
+    user = User(email=f"{uuid.uuid4()}@t.com", username=f"u-{uuid.uuid4().hex[:8]}",
+                hashed_password=hash_password("pw"), is_superuser=True)
+    device = Device(name="dev-1", model="USG FLEX 100", mgmt_ip="10.0.0.1", adapter="mock",
+                    encrypted_credentials=encrypt_credentials("admin", "pw"), tags=[])
+    session.add_all([user, device])
+    session.commit()
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    # Several findings share a severity and title, so the id tie-break matters
+    specs = [("low", "b"), ("critical", "z"), ("high", "a"), ("low", "a"),
+             ("critical", "z"), ("info", "a"), ("high", "a"), ("critical", "a")]
+    for severity, title in specs:
+        session.add(SecurityFinding(device_id=device.id, category="firmware",
+                                    severity=severity, title=title,
+                                    description="d", recommendation="r"))
+    session.commit()
+    return session.exec(select(SecurityFinding)).all()
+
+
+def _expected_order(findings):
+    rank = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
+    return [str(f.id) for f in sorted(findings, key=lambda f: (rank[f.severity], f.title, str(f.id)))]
+
+
+def _page_all(client, limit):
+    ids, cursor = [], None
+    for _ in range(20):
+        params = {"limit": limit}
+        if cursor:
+            params["after"] = cursor
+        resp = client.get(URL, params=params)
+        assert resp.status_code == 200
+        ids += [f["id"] for f in resp.json()]
+        cursor = resp.headers.get("x-next-cursor")
+        if cursor is None:
+            return ids
+    pytest.fail("paging did not terminate")
+
+
+def test_pages_cover_all_findings_in_order(client, findings):
+    assert _page_all(client, limit=3) == _expected_order(findings)
+
+
+def test_no_cursor_when_everything_fits(client, findings):
+    resp = client.get(URL, params={"limit": len(findings)})
+    assert len(resp.json()) == len(findings)
+    assert "x-next-cursor" not in resp.headers
+
+
+def test_cursor_survives_deletion_of_its_row(client, session, findings):
+    expected = _expected_order(findings)
+    first = client.get(URL, params={"limit": 3})
+    cursor = first.headers["x-next-cursor"]
+    last_seen = session.get(SecurityFinding, uuid.UUID(first.json()[-1]["id"]))
+    session.delete(last_seen)
+    session.commit()
+
+    rest = client.get(URL, params={"limit": 100, "after": cursor}).json()
+    assert [f["id"] for f in rest] == expected[3:]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm9wZQ==", "WzEsMl0="])
+def test_invalid_cursor_is_rejected(client, findings, cursor):
+    assert client.get(URL, params={"after": cursor}).status_code == 400
@@ -1,8 +1,25 @@
 import { api } from './client'
 import type { ConfigSnapshot, BackupSettings } from '../types'
 
+// Backup/restore endpoints queue a Celery task; poll until it finishes or
+// timeoutMs passes. Failures and timeouts are rethrown in the same shape as an
+// API error ({ response.data.detail }).
+async function waitForTask<T>(taskId: string, intervalMs = 1000, timeoutMs = 10 * 60_000): Promise<T> {
+  const deadline = Date.now() + timeoutMs
+  while (Date.now() < deadline) {
+    const { data } = await api.get(`/backups/tasks/${taskId}`)
+    if (data.status === 'success') return data.result as T
+    if (data.status === 'failure' || data.status === 'revoked') {
+      throw { response: { data: { detail: data.error ?? 'Task failed' } } }
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs))
+  }
+  throw { response: { data: { detail: `Task ${taskId} did not finish within ${timeoutMs / 1000} s` } } }
+}
+
 export const triggerBackup = (deviceId: string) =>
-  api.post(`/backups/${deviceId}/trigger`).then(r => r.data as ConfigSnapshot)
+  api.post(`/backups/${deviceId}/trigger`)
+     .then(r => waitForTask<Pick<ConfigSnapshot, 'id' | 'device_id' | 'version' | 'checksum'>>(r.data.task_id))
 
 export const listBackups = (deviceId: string) =>
   api.get(`/backups/${deviceId}`).then(r => r.data as ConfigSnapshot[])
@@ -30,8 +47,8 @@ export const compareBackups = (snapshotIds: string[]) =>
 
 export const restoreBackup = (snapshotId: string, deviceId?: string) =>
   api.post(`/backups/${snapshotId}/restore`, deviceId ? { device_id: deviceId } : {})
-     .then(r => r.data)
+     .then(r => waitForTask<{ success: boolean; message: string; pre_restore_snapshot_id: string }>(r.data.task_id))
 
 export const uploadAndRestore = (deviceId: string, config: unknown, label?: string) =>
   api.post(`/backups/${deviceId}/upload-restore`, { config, label })
-     .then(r => r.data)
+     .then(r => waitForTask<{ success: boolean; message: string; snapshot_id: string | null }>(r.data.task_id))
@@ -1,13 +1,24 @@
 import { api } from './client'
 import type { SecurityFinding, SecurityScan, DeviceRiskScore, SecuritySummary, SecurityExclusion } from '../types'
 
-export const listFindings = (params?: {
+// The endpoint returns one page at a time; follow X-Next-Cursor until it is
+// absent so callers still get every matching finding.
+export const listFindings = async (params?: {
   device_id?: string
   severity?: string
   status?: string
   category?: string
   scan_id?: string
-}) => api.get<SecurityFinding[]>('/security/findings', { params }).then((r) => r.data)
+}) => {
+  const findings: SecurityFinding[] = []
+  let after: string | undefined
+  do {
+    const r = await api.get<SecurityFinding[]>('/security/findings', { params: { ...params, after } })
+    findings.push(...r.data)
+    after = r.headers['x-next-cursor']
+  } while (after)
+  return findings
+}
 
 export const getFinding = (id: string) =>
   api.get<SecurityFinding>(`/security/findings/${id}`).then((r) => r.data)